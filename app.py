@@ -4,27 +4,32 @@ Healthcare Discharge Assistant - Streamlit App
 
 import streamlit as st
 import os
+import re
+import sys
+import platform
 import tempfile
+import shutil
 from datetime import datetime, timedelta
 import time
-import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import certifi
+from pathlib import Path
 
 # Set environment variables to help with GPU memory and multiprocessing issues
 os.environ['PYTORCH_ENABLE_MPS_FALLBACK'] = '1'
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
-os.environ['OMP_NUM_THREADS'] = '1'
-
-# Import utility modules
-from utils.transcriber import AudioTranscriber
-from utils.summarizer import DischargeSummarizer
-from utils.pdf_generator import PDFGenerator
-from utils.telegram_sender import TelegramSender
-from utils.email_sender import EmailSender
-from utils.calendar import GoogleCalendarManager
-from utils.scheduler import HealthcareScheduler
-from utils.memory import ChromaDBMemory, create_patient_profile
-from utils.encryption import PatientDataEncryption
+
+# Only pin OpenMP to a single thread when no CUDA/MPS accelerator is present.
+# This has to happen before torch is imported, so probe without importing it.
+if not (shutil.which('nvidia-smi') or (sys.platform == 'darwin' and platform.machine() == 'arm64')):
+    os.environ['OMP_NUM_THREADS'] = '1'
+
+# Point HTTP clients at certifi's CA bundle unless one is already configured
+_CERT = certifi.where()
+os.environ.setdefault("SSL_CERT_FILE", _CERT)
+
+# Utility modules pull in torch, transformers, chromadb and the Google client
+# libraries, so they are imported lazily where they are first needed
 
 # Configure page
 st.set_page_config(
@@ -34,48 +39,93 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .step-header {
-        font-size: 1.5rem;
-        color: #2c3e50;
-        margin-bottom: 1rem;
-        padding: 0.5rem;
-        background-color: #ecf0f1;
-        border-radius: 5px;
-    }
-    .success-box {
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .info-box {
-        background-color: #d1ecf1;
-        border: 1px solid #bee5eb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .warning-box {
-        background-color: #fff3cd;
-        border: 1px solid #ffeaa7;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-os.environ["SSL_CERT_FILE"] = certifi.where()
+# Workflow steps shown in the sidebar
+STEPS = (
+    "Audio Upload",
+    "Patient Form",
+    "Generate Summary",
+    "Create PDF",
+    "Send Notifications",
+    "Medication Reminders"
+)
+
+ABOUT_TEXT = """
+**Healthcare Discharge Assistant**
+
+This application helps healthcare providers create comprehensive discharge summaries and manage patient follow-up care.
+
+**Features:**
+- Audio transcription
+- AI-powered summaries
+- PDF generation
+- Automated notifications
+- Medication reminders
+- Calendar integration
+"""
+
+# Matches one non-blank line with surrounding whitespace stripped
+_LINE_RE = re.compile(r'\s*([^\n]+?)\s*(?:\n|$)')
+
+def _split_lines(text):
+    """Split multi-line form input into a list of stripped, non-empty lines."""
+    return [line for line in _LINE_RE.findall(text) if line]
+
+@st.cache_resource(show_spinner=False)
+def get_transcriber(model_name, compute_type="int8"):
+    """Load a Whisper transcriber once per process and reuse it across reruns."""
+    from utils.transcriber import AudioTranscriber
+    return AudioTranscriber(model_name=model_name, compute_type=compute_type)
+
+@st.cache_resource(show_spinner=False)
+def get_summarizer(model_name, onnx_path=None):
+    """Load a summarizer model once per process and reuse it across reruns."""
+    from utils.summarizer import DischargeSummarizer
+    return DischargeSummarizer(model_name=model_name, onnx_path=onnx_path)
+
+@st.cache_data
+def load_css():
+    """Read the custom stylesheet once per process."""
+    return Path(__file__).parent.joinpath("static", "app.css").read_text()
+
+def apply_custom_css():
+    """Inject the custom CSS for better styling."""
+    # Streamlit drops elements that are not re-emitted on a rerun, so the
+    # style block is sent every run but the file is only read once
+    st.markdown(f"<style>\n{load_css()}</style>", unsafe_allow_html=True)
+
+@st.cache_resource(show_spinner=False)
+def get_memory():
+    """Open the patient memory store once per process so the index stays loaded."""
+    from utils.memory import ChromaDBMemory
+    return ChromaDBMemory()
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_generator():
+    """Create the PDF generator once per process and reuse it across reruns."""
+    from utils.pdf_generator import PDFGenerator
+    return PDFGenerator()
+
+@st.cache_resource(show_spinner=False)
+def get_scheduler():
+    """
+    Create the reminder scheduler once per process.
+    
+    Jobs live in the schedule library's global registry, so a single
+    scheduler and loop thread must serve every session.
+    """
+    from utils.scheduler import HealthcareScheduler
+    return HealthcareScheduler()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def read_pdf(path, mtime):
+    """Read a generated PDF once; the modification time invalidates the cache."""
+    with open(path, "rb") as file:
+        return file.read()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def telegram_preview(patient_name, summary):
+    """Build the default Telegram message from the first 500 characters of the summary."""
+    return f"Discharge Summary for {patient_name}:\n\n{summary[:500]}..."
 
 def initialize_session_state():
     """Initialize session state variables."""
@@ -132,7 +182,7 @@ def step_1_audio_upload():
         
         # Transcription options
         st.subheader("Transcription Options")
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         
         with col1:
             model_size = st.selectbox(
@@ -143,36 +193,93 @@ def step_1_audio_upload():
             )
         
         with col2:
+            compute_type = st.selectbox(
+                "Compute Type",
+                ["int8", "float32"],
+                index=0,
+                help="int8 is faster on CPU with a small accuracy trade-off"
+            )
+        
+        with col3:
             medical_mode = st.checkbox(
                 "Medical Mode",
                 value=True,
                 help="Optimize for medical terminology"
             )
         
+        batched_chunking = st.checkbox(
+            "Batched Chunking",
+            value=False,
+            help="Faster on long recordings, but words at segment boundaries may be cut "
+                 "and each segment is transcribed without the preceding text"
+        )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            chunk_length_s = st.slider(
+                "Chunk Length (seconds)",
+                min_value=5,
+                max_value=30,
+                value=30,
+                disabled=not batched_chunking,
+                help="Audio is split into segments of this length"
+            )
+        
+        with col2:
+            batch_size = st.slider(
+                "Batch Size",
+                min_value=1,
+                max_value=16,
+                value=4,
+                disabled=not batched_chunking,
+                help="Number of segments transcribed together"
+            )
+        
+        # Whisper's own long-form transcription unless batching is requested
+        if not batched_chunking:
+            chunk_length_s = None
+        
         # Transcribe button
         if st.button("🎤 Transcribe Audio", type="primary"):
             with st.spinner("Transcribing audio... This may take a few minutes."):
                 try:
+                    from utils.transcriber import load_audio
+                    
                     # Save uploaded file temporarily
                     with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
+                        uploaded_file.seek(0)
+                        shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
                         tmp_file_path = tmp_file.name
                     
-                    # Initialize transcriber
-                    transcriber = AudioTranscriber(model_name=model_size)
+                    # Decode once to 16 kHz mono and clean up temp file right away
+                    try:
+                        audio = load_audio(tmp_file_path)
+                    finally:
+                        os.unlink(tmp_file_path)
+                    
+                    # Get cached transcriber
+                    transcriber = get_transcriber(model_size, compute_type)
                     
                     # Transcribe
                     if medical_mode:
-                        result = transcriber.transcribe_medical_audio(tmp_file_path)
+                        result = transcriber.transcribe_medical_audio(
+                            audio,
+                            chunk_length_s=chunk_length_s,
+                            batch_size=batch_size
+                        )
+                    elif chunk_length_s:
+                        result = transcriber.transcribe_chunked(
+                            audio,
+                            chunk_length_s=chunk_length_s,
+                            batch_size=batch_size
+                        )
                     else:
-                        result = transcriber.transcribe_audio(tmp_file_path)
+                        result = transcriber.transcribe_audio(audio)
                     
                     # Store transcription
                     st.session_state.transcription = result
                     
-                    # Clean up temp file
-                    os.unlink(tmp_file_path)
-                    
                     st.success("✅ Transcription completed successfully!")
                     st.session_state.step = 2
                     
@@ -193,27 +300,29 @@ def step_2_patient_form():
     """Step 2: Patient information form."""
     st.markdown('<h2 class="step-header">Step 2: Patient Information</h2>', unsafe_allow_html=True)
     
+    patient_data = st.session_state.patient_data
+    
     with st.form("patient_form"):
         st.subheader("Patient Details")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            name = st.text_input("Full Name *", value=st.session_state.patient_data.get('name', ''))
-            age = st.number_input("Age *", min_value=0, max_value=120, value=st.session_state.patient_data.get('age', 0))
-            gender = st.selectbox("Gender *", ["Male", "Female", "Other"], index=0 if st.session_state.patient_data.get('gender') != "Female" else 1)
-            diagnosis = st.text_input("Primary Diagnosis *", value=st.session_state.patient_data.get('diagnosis', ''))
+            name = st.text_input("Full Name *", value=patient_data.get('name', ''))
+            age = st.number_input("Age *", min_value=0, max_value=120, value=patient_data.get('age', 0))
+            gender = st.selectbox("Gender *", ["Male", "Female", "Other"], index=0 if patient_data.get('gender') != "Female" else 1)
+            diagnosis = st.text_input("Primary Diagnosis *", value=patient_data.get('diagnosis', ''))
         
         with col2:
-            admission_date = st.date_input("Admission Date *", value=st.session_state.patient_data.get('admission_date', datetime.now().date()))
-            discharge_date = st.date_input("Discharge Date *", value=st.session_state.patient_data.get('discharge_date', datetime.now().date()))
-            email = st.text_input("Email Address", value=st.session_state.patient_data.get('email', ''))
-            telegram_chat_id = st.text_input("Telegram Chat ID", value=st.session_state.patient_data.get('telegram_chat_id', ''))
+            admission_date = st.date_input("Admission Date *", value=patient_data.get('admission_date', datetime.now().date()))
+            discharge_date = st.date_input("Discharge Date *", value=patient_data.get('discharge_date', datetime.now().date()))
+            email = st.text_input("Email Address", value=patient_data.get('email', ''))
+            telegram_chat_id = st.text_input("Telegram Chat ID", value=patient_data.get('telegram_chat_id', ''))
         
         st.subheader("Medical History")
         medical_history = st.text_area(
             "Medical History",
-            value=st.session_state.patient_data.get('medical_history', ''),
+            value=patient_data.get('medical_history', ''),
             height=100,
             help="Previous medical conditions, surgeries, etc."
         )
@@ -221,7 +330,7 @@ def step_2_patient_form():
         st.subheader("Current Medications")
         medications_input = st.text_area(
             "Current Medications",
-            value=st.session_state.patient_data.get('medications', ''),
+            value=patient_data.get('medications', ''),
             height=100,
             help="List current medications with dosages"
         )
@@ -229,7 +338,7 @@ def step_2_patient_form():
         st.subheader("Risk Factors")
         risk_factors = st.text_area(
             "Risk Factors",
-            value=st.session_state.patient_data.get('risk_factors', ''),
+            value=patient_data.get('risk_factors', ''),
             height=80,
             help="Smoking, diabetes, hypertension, etc."
         )
@@ -245,8 +354,8 @@ def step_2_patient_form():
                     'age': age,
                     'gender': gender,
                     'diagnosis': diagnosis,
-                    'admission_date': admission_date.strftime("%Y-%m-%d"),
-                    'discharge_date': discharge_date.strftime("%Y-%m-%d"),
+                    'admission_date': admission_date.isoformat(),
+                    'discharge_date': discharge_date.isoformat(),
                     'email': email,
                     'telegram_chat_id': telegram_chat_id,
                     'medical_history': medical_history,
@@ -264,11 +373,14 @@ def step_3_generate_summary():
     """Step 3: Generate discharge summary."""
     st.markdown('<h2 class="step-header">Step 3: Generate Discharge Summary</h2>', unsafe_allow_html=True)
     
-    if not st.session_state.transcription:
+    transcription = st.session_state.transcription
+    patient_data = st.session_state.patient_data
+    
+    if not transcription:
         st.error("❌ No transcription available. Please go back to Step 1.")
         return
     
-    if not st.session_state.patient_data:
+    if not patient_data:
         st.error("❌ No patient data available. Please go back to Step 2.")
         return
     
@@ -301,29 +413,32 @@ def step_3_generate_summary():
             try:
                 # Initialize summarizer with small model for CPU usage
                 try:
-                    summarizer = DischargeSummarizer(model_name="google/flan-t5-small")
+                    summarizer = get_summarizer(
+                        "google/flan-t5-small",
+                        onnx_path=os.getenv("SUMMARIZER_ONNX_PATH")
+                    )
                 except Exception as e:
                     st.error(f"Error loading summarizer model: {e}")
                     st.stop()
                 
                 # Prepare patient info dictionary
                 patient_info = {
-                    "name": st.session_state.patient_data['name'],
-                    "age": st.session_state.patient_data['age'],
-                    "gender": st.session_state.patient_data.get('gender', 'N/A'),
-                    "medical_history": st.session_state.patient_data['medical_history'],
-                    "current_medications": st.session_state.patient_data['medications'],
-                    "allergies": st.session_state.patient_data.get('allergies', 'None')
+                    "name": patient_data['name'],
+                    "age": patient_data['age'],
+                    "gender": patient_data.get('gender', 'N/A'),
+                    "medical_history": patient_data['medical_history'],
+                    "current_medications": patient_data['medications'],
+                    "allergies": patient_data.get('allergies', 'None')
                 }
                 
                 # Generate summary
                 if summary_type == "Standard":
-                    summary = summarizer.generate_summary(st.session_state.transcription, patient_info)
+                    summary = summarizer.generate_summary(transcription, patient_info)
                 elif summary_type == "Detailed":
-                    structured_summary = summarizer.generate_structured_summary(st.session_state.transcription, patient_info)
+                    structured_summary = summarizer.generate_structured_summary(transcription, patient_info)
                     summary = structured_summary.get("main_summary", "Error generating structured summary")
                 else:  # Patient-Friendly
-                    summary = summarizer.generate_patient_friendly_summary(st.session_state.transcription, patient_info)
+                    summary = summarizer.generate_patient_friendly_summary(transcription, patient_info)
                 
                 st.session_state.summary = summary
                 
@@ -339,11 +454,15 @@ def step_3_generate_summary():
         st.subheader("📋 Generated Summary")
         st.text_area("Discharge Summary", st.session_state.summary, height=300, disabled=True)
 
+@st.fragment
 def step_4_pdf_generation():
     """Step 4: Generate and download PDF."""
     st.markdown('<h2 class="step-header">Step 4: Generate PDF</h2>', unsafe_allow_html=True)
     
-    if not st.session_state.summary:
+    patient_data = st.session_state.patient_data
+    summary = st.session_state.summary
+    
+    if not summary:
         st.error("❌ No summary available. Please go back to Step 3.")
         return
     
@@ -356,28 +475,27 @@ def step_4_pdf_generation():
         include_follow_up = st.checkbox("Include Follow-up Instructions", value=True)
     
     with col2:
-        pdf_title = st.text_input("PDF Title", value=f"Discharge Summary - {st.session_state.patient_data.get('name', 'Patient')}")
+        pdf_title = st.text_input("PDF Title", value=f"Discharge Summary - {patient_data.get('name', 'Patient')}")
         include_signatures = st.checkbox("Include Signature Section", value=True)
     
     # Generate PDF button
     if st.button("📄 Generate PDF", type="primary"):
         with st.spinner("Generating PDF..."):
             try:
-                # Initialize PDF generator
-                generator = PDFGenerator()
+                # Get cached PDF generator
+                generator = get_pdf_generator()
                 
                 # Prepare medications list
                 medications = []
-                if include_medications and st.session_state.patient_data.get('medications'):
-                    med_list = st.session_state.patient_data['medications'].split('\n')
-                    medications = [med.strip() for med in med_list if med.strip()]
+                if include_medications:
+                    medications = _split_lines(patient_data.get('medications') or "")
                 
                 # Generate PDF
                 pdf_path = generator.create_discharge_summary(
-                    patient_data=st.session_state.patient_data,
-                    discharge_summary=st.session_state.summary,
+                    patient_data=patient_data,
+                    discharge_summary=summary,
                     medications=medications if include_medications else None,
-                    follow_up_instructions=st.session_state.summary if include_follow_up else ""
+                    follow_up_instructions=summary if include_follow_up else ""
                 )
                 
                 st.session_state.pdf_path = pdf_path
@@ -393,8 +511,7 @@ def step_4_pdf_generation():
     if st.session_state.pdf_path and os.path.exists(st.session_state.pdf_path):
         st.subheader("📄 Download PDF")
         
-        with open(st.session_state.pdf_path, "rb") as file:
-            pdf_bytes = file.read()
+        pdf_bytes = read_pdf(st.session_state.pdf_path, os.path.getmtime(st.session_state.pdf_path))
         
         st.download_button(
             label="📥 Download Discharge Summary PDF",
@@ -404,14 +521,18 @@ def step_4_pdf_generation():
         )
         
         # Display PDF info
-        file_size = os.path.getsize(st.session_state.pdf_path) / 1024
+        file_size = len(pdf_bytes) / 1024
         st.info(f"📊 PDF Size: {file_size:.1f} KB")
 
+@st.fragment
 def step_5_notifications():
     """Step 5: Send notifications via Telegram and Email."""
     st.markdown('<h2 class="step-header">Step 5: Send Notifications</h2>', unsafe_allow_html=True)
     
-    if not st.session_state.summary:
+    patient_data = st.session_state.patient_data
+    summary = st.session_state.summary
+    
+    if not summary:
         st.error("❌ No summary available. Please go back to Step 3.")
         return
     
@@ -432,114 +553,129 @@ def step_5_notifications():
     
     telegram_message = st.text_area(
         "Telegram Message",
-        value=f"Discharge Summary for {st.session_state.patient_data.get('name', 'Patient')}:\n\n{st.session_state.summary[:500]}...",
+        value=telegram_preview(patient_data.get('name', 'Patient'), summary),
         height=150
     )
     
     email_subject = st.text_input(
         "Email Subject",
-        value=f"Discharge Summary - {st.session_state.patient_data.get('name', 'Patient')}"
+        value=f"Discharge Summary - {patient_data.get('name', 'Patient')}"
     )
     
     # Send notifications button
     if st.button("📤 Send Notifications", type="primary"):
         with st.spinner("Sending notifications..."):
-            success_count = 0
-            total_count = 0
-            
             try:
+                # Read session state up front; worker threads have no Streamlit context
+                pdf_path = st.session_state.pdf_path
+                
+                # Each task is (name, callable, success message, failure message)
+                tasks = []
+                
                 # Send Telegram message
-                if send_telegram and st.session_state.patient_data.get('telegram_chat_id'):
-                    total_count += 1
-                    try:
+                if send_telegram and patient_data.get('telegram_chat_id'):
+                    def send_telegram_message():
+                        from utils.telegram_sender import TelegramSender
                         telegram = TelegramSender()
                         telegram.send_discharge_summary(
-                            chat_id=st.session_state.patient_data['telegram_chat_id'],
-                            patient_name=st.session_state.patient_data['name'],
+                            chat_id=patient_data['telegram_chat_id'],
+                            patient_name=patient_data['name'],
                             summary=telegram_message
                         )
-                        success_count += 1
-                        st.success("✅ Telegram message sent successfully!")
-                    except Exception as e:
-                        st.error(f"❌ Telegram message failed: {str(e)}")
+                        return True
+                    
+                    tasks.append(("Telegram message", send_telegram_message,
+                                  "✅ Telegram message sent successfully!", None))
                 
                 # Send Email
-                if send_email and st.session_state.patient_data.get('email'):
-                    total_count += 1
-                    try:
-                        email_sender = EmailSender()
-                        if st.session_state.pdf_path and os.path.exists(st.session_state.pdf_path):
-                                                    email_sender.send_discharge_summary_email(
-                            recipient_email=st.session_state.patient_data['email'],
-                            patient_name=st.session_state.patient_data['name'],
-                            summary_text=st.session_state.summary,
-                            pdf_path=st.session_state.pdf_path
-                        )
-                        else:
-                            email_sender.send_healthcare_email(
-                                to_email=st.session_state.patient_data['email'],
+                if send_email and patient_data.get('email'):
+                    def send_email_message():
+                        from utils.email_sender import EmailSender
+                        with EmailSender() as email_sender:
+                            if pdf_path and os.path.exists(pdf_path):
+                                return email_sender.send_discharge_summary_email(
+                                    recipient_email=patient_data['email'],
+                                    patient_name=patient_data['name'],
+                                    summary_text=summary,
+                                    pdf_path=pdf_path
+                                )
+                            return email_sender.send_general_healthcare_email(
+                                recipient_email=patient_data['email'],
                                 subject=email_subject,
-                                message=st.session_state.summary
+                                body=summary
                             )
-                        success_count += 1
-                        st.success("✅ Email sent successfully!")
-                    except Exception as e:
-                        st.error(f"❌ Email failed: {str(e)}")
+                    
+                    tasks.append(("Email", send_email_message,
+                                  "✅ Email sent successfully!",
+                                  "❌ Email sending failed"))
                 
                 # Create Google Calendar event
                 if send_calendar:
-                    total_count += 1
-                    try:
-                        calendar = GoogleCalendarManager()
+                    def create_calendar_event():
+                        from utils.calendar import get_calendar_manager
+                        calendar = get_calendar_manager()
                         event_id = calendar.create_followup_event(
-                            patient_name=st.session_state.patient_data['name'],
-                            discharge_date=datetime.strptime(st.session_state.patient_data['discharge_date'], "%Y-%m-%d"),
+                            patient_name=patient_data['name'],
+                            discharge_date=datetime.fromisoformat(patient_data['discharge_date']),
                             appointment_type="Follow-up",
                             location="Hospital Outpatient Clinic",
-                            description=f"Follow-up appointment for {st.session_state.patient_data['diagnosis']}"
+                            description=f"Follow-up appointment for {patient_data['diagnosis']}"
                         )
-                        if event_id:
-                            success_count += 1
-                            st.success("✅ Google Calendar event created successfully!")
-                        else:
-                            st.error("❌ Google Calendar event creation failed")
-                    except Exception as e:
-                        st.error(f"❌ Google Calendar failed: {str(e)}")
+                        return bool(event_id)
+                    
+                    tasks.append(("Google Calendar", create_calendar_event,
+                                  "✅ Google Calendar event created successfully!",
+                                  "❌ Google Calendar event creation failed"))
                 
                 # Store in memory
                 if store_in_memory:
-                    total_count += 1
-                    try:
-                        memory = ChromaDBMemory()
+                    def store_patient_profile():
+                        from utils.memory import create_patient_profile
+                        memory = get_memory()
                         # Clean up medications and risk factors
-                        medications = []
-                        if st.session_state.patient_data.get('medications'):
-                            med_list = st.session_state.patient_data['medications'].split('\n')
-                            medications = [med.strip() for med in med_list if med.strip()]
-                        
-                        risk_factors = []
-                        if st.session_state.patient_data.get('risk_factors'):
-                            risk_list = st.session_state.patient_data['risk_factors'].split('\n')
-                            risk_factors = [risk.strip() for risk in risk_list if risk.strip()]
+                        medications = _split_lines(patient_data.get('medications') or "")
+                        risk_factors = _split_lines(patient_data.get('risk_factors') or "")
                         
                         patient_profile = create_patient_profile(
-                            name=st.session_state.patient_data['name'],
-                            age=st.session_state.patient_data['age'],
-                            gender=st.session_state.patient_data['gender'],
-                            diagnosis=st.session_state.patient_data['diagnosis'],
+                            name=patient_data['name'],
+                            age=patient_data['age'],
+                            gender=patient_data['gender'],
+                            diagnosis=patient_data['diagnosis'],
                             medications=medications,
-                            follow_up_notes=st.session_state.summary,
+                            follow_up_notes=summary,
                             risk_factors=risk_factors,
                             comorbidities=[],
-                            treatment_plan=st.session_state.summary
+                            treatment_plan=summary
                         )
-                        if memory.add_patient_profile(patient_profile):
-                            success_count += 1
-                            st.success("✅ Patient profile stored in memory!")
-                        else:
-                            st.error("❌ Failed to store patient profile")
-                    except Exception as e:
-                        st.error(f"❌ Memory storage failed: {str(e)}")
+                        return memory.add_patient_profile(patient_profile)
+                    
+                    tasks.append(("Memory storage", store_patient_profile,
+                                  "✅ Patient profile stored in memory!",
+                                  "❌ Failed to store patient profile"))
+                
+                # Run all network-bound tasks concurrently
+                results = {}
+                if tasks:
+                    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                        futures = {executor.submit(task[1]): task[0] for task in tasks}
+                        for future in as_completed(futures):
+                            try:
+                                results[futures[future]] = (future.result(), None)
+                            except Exception as e:
+                                results[futures[future]] = (False, e)
+                
+                # Render results on the main thread in a stable order
+                success_count = 0
+                total_count = len(tasks)
+                for name, _, success_message, failure_message in tasks:
+                    succeeded, error = results[name]
+                    if error is not None:
+                        st.error(f"❌ {name} failed: {str(error)}")
+                    elif succeeded:
+                        success_count += 1
+                        st.success(success_message)
+                    else:
+                        st.error(failure_message)
                 
                 # Summary
                 if success_count == total_count and total_count > 0:
@@ -554,10 +690,90 @@ def step_5_notifications():
             except Exception as e:
                 st.error(f"❌ Notification process failed: {str(e)}")
 
+def _remove_deleted_reminders(editor_key):
+    """Drop the reminders whose Remove box was ticked in the reminders table."""
+    edited_rows = st.session_state[editor_key].get("edited_rows", {})
+    removed_rows = {int(i) for i, changes in edited_rows.items() if changes.get("Remove")}
+    st.session_state.medication_reminders = [
+        reminder for i, reminder in enumerate(st.session_state.medication_reminders)
+        if i not in removed_rows
+    ]
+    # A fresh editor key discards the applied edits
+    st.session_state.reminders_editor_version = st.session_state.get('reminders_editor_version', 0) + 1
+
+@st.fragment
+def _render_reminders():
+    """Show the reminder list; table edits rerun only this fragment."""
+    # Display current reminders
+    if st.session_state.medication_reminders:
+        st.subheader("📋 Current Medication Reminders")
+        
+        # One table instead of a row of widgets per reminder; only the Remove
+        # column is editable and ticking it removes the reminder
+        editor_key = f"reminders_editor_{st.session_state.get('reminders_editor_version', 0)}"
+        rows = [
+            {
+                "Medication": reminder['medication'],
+                "Dosage": reminder.get('dosage', ''),
+                "Frequency": f"{reminder['frequency']}x daily",
+                "Times": reminder.get('times_display') or ", ".join(reminder['times']),
+                "Duration (days)": reminder['duration'],
+                "Message": reminder['message'],
+                "Remove": False
+            }
+            for reminder in st.session_state.medication_reminders
+        ]
+        st.data_editor(
+            rows,
+            key=editor_key,
+            num_rows="fixed",
+            disabled=["Medication", "Dosage", "Frequency", "Times", "Duration (days)", "Message"],
+            hide_index=True,
+            use_container_width=True,
+            on_change=_remove_deleted_reminders,
+            args=(editor_key,)
+        )
+        st.caption("Tick Remove to delete a reminder.")
+    
+    # Start reminders button
+    if st.session_state.medication_reminders:
+        if st.button("🚀 Start All Reminders", type="primary"):
+            with st.spinner("Starting medication reminders..."):
+                try:
+                    scheduler = get_scheduler()
+                    
+                    for reminder in st.session_state.medication_reminders:
+                        # Skip reminders that were already scheduled
+                        if reminder.get('schedule_id'):
+                            continue
+                        
+                        # Add medication schedule
+                        reminder['schedule_id'] = scheduler.add_medication_schedule(
+                            medication_name=reminder['medication'],
+                            dosage=reminder.get('dosage', ''),
+                            times=reminder['times'],
+                            duration_days=reminder['duration'],
+                            additional_notes=reminder['message'],
+                            chat_id=reminder['chat_id']
+                        )
+                    
+                    # Start the scheduler loop if it isn't already running
+                    if not (scheduler.scheduler_thread and scheduler.scheduler_thread.is_alive()):
+                        scheduler.start_scheduler()
+                    
+                    st.success("✅ Medication reminders started successfully!")
+                    st.info("💡 Reminders will be sent via Telegram at the specified times.")
+                    
+                except Exception as e:
+                    st.error(f"❌ Failed to start reminders: {str(e)}")
+
+@st.fragment
 def step_6_medication_reminders():
     """Step 6: Set up medication reminders."""
     st.markdown('<h2 class="step-header">Step 6: Medication Reminders</h2>', unsafe_allow_html=True)
     
+    patient_data = st.session_state.patient_data
+    
     st.subheader("Set Up Medication Reminders")
     st.info("Add medications and set up Telegram reminders for the patient.")
     
@@ -585,68 +801,27 @@ def step_6_medication_reminders():
         reminder_times = []
         
         # Auto-generate appropriate times based on frequency
-        if frequency == 1:
-            # Once daily - default to morning
-            default_time = datetime(2024, 1, 1, 8, 0).time()
-            time1 = st.time_input("Time *", value=default_time, key="time1")
-            reminder_times.append(time1.strftime("%H:%M"))
-            
-        elif frequency == 2:
-            # Twice daily - morning and evening
-            col1, col2 = st.columns(2)
-            with col1:
-                time1 = st.time_input("Morning Time *", value=datetime(2024, 1, 1, 8, 0).time(), key="time1")
-                reminder_times.append(time1.strftime("%H:%M"))
-            with col2:
-                time2 = st.time_input("Evening Time *", value=datetime(2024, 1, 1, 20, 0).time(), key="time2")
-                reminder_times.append(time2.strftime("%H:%M"))
-                
-        elif frequency == 3:
-            # Three times daily - morning, afternoon, evening
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                time1 = st.time_input("Morning Time *", value=datetime(2024, 1, 1, 8, 0).time(), key="time1")
-                reminder_times.append(time1.strftime("%H:%M"))
-            with col2:
-                time2 = st.time_input("Afternoon Time *", value=datetime(2024, 1, 1, 14, 0).time(), key="time2")
-                reminder_times.append(time2.strftime("%H:%M"))
-            with col3:
-                time3 = st.time_input("Evening Time *", value=datetime(2024, 1, 1, 20, 0).time(), key="time3")
-                reminder_times.append(time3.strftime("%H:%M"))
-                
-        elif frequency == 4:
-            # Four times daily - every 6 hours
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                time1 = st.time_input("Time 1 *", value=datetime(2024, 1, 1, 6, 0).time(), key="time1")
-                reminder_times.append(time1.strftime("%H:%M"))
-            with col2:
-                time2 = st.time_input("Time 2 *", value=datetime(2024, 1, 1, 12, 0).time(), key="time2")
-                reminder_times.append(time2.strftime("%H:%M"))
-            with col3:
-                time3 = st.time_input("Time 3 *", value=datetime(2024, 1, 1, 18, 0).time(), key="time3")
-                reminder_times.append(time3.strftime("%H:%M"))
-            with col4:
-                time4 = st.time_input("Time 4 *", value=datetime(2024, 1, 1, 0, 0).time(), key="time4")
-                reminder_times.append(time4.strftime("%H:%M"))
-                
-        elif frequency == 5:
-            # Five times daily - every 4-5 hours
-            col1, col2, col3, col4, col5 = st.columns(5)
-            times = [6, 10, 14, 18, 22]  # Every 4 hours
-            for i, hour in enumerate(times, 1):
-                with eval(f"col{i}"):
-                    time_val = st.time_input(f"Time {i} *", value=datetime(2024, 1, 1, hour, 0).time(), key=f"time{i}")
-                    reminder_times.append(time_val.strftime("%H:%M"))
-                    
-        elif frequency == 6:
-            # Six times daily - every 4 hours including night
-            col1, col2, col3, col4, col5, col6 = st.columns(6)
-            times = [6, 10, 14, 18, 22, 2]  # Every 4 hours including night
-            for i, hour in enumerate(times, 1):
-                with eval(f"col{i}"):
-                    time_val = st.time_input(f"Time {i} *", value=datetime(2024, 1, 1, hour, 0).time(), key=f"time{i}")
-                    reminder_times.append(time_val.strftime("%H:%M"))
+        default_hours = {
+            1: [8],                       # Once daily - morning
+            2: [8, 20],                   # Twice daily - morning and evening
+            3: [8, 14, 20],               # Three times daily - morning, afternoon, evening
+            4: [6, 12, 18, 0],            # Four times daily - every 6 hours
+            5: [6, 10, 14, 18, 22],       # Five times daily - every 4 hours
+            6: [6, 10, 14, 18, 22, 2]     # Six times daily - every 4 hours including night
+        }
+        time_labels = {
+            1: ["Time *"],
+            2: ["Morning Time *", "Evening Time *"],
+            3: ["Morning Time *", "Afternoon Time *", "Evening Time *"]
+        }
+        
+        hours = default_hours[frequency]
+        labels = time_labels.get(frequency, [f"Time {i} *" for i in range(1, frequency + 1)])
+        cols = st.columns(frequency)
+        for i, hour in enumerate(hours):
+            with cols[i]:
+                time_val = st.time_input(labels[i], value=datetime(2024, 1, 1, hour, 0).time(), key=f"time{i + 1}")
+                reminder_times.append(time_val.strftime("%H:%M"))
         
         # Show auto-generated times info
         if frequency > 1:
@@ -661,82 +836,27 @@ def step_6_medication_reminders():
         add_reminder = st.form_submit_button("➕ Add Reminder", type="primary")
         
         if add_reminder:
-            if medication_name and reminder_times and st.session_state.patient_data.get('telegram_chat_id'):
+            if medication_name and reminder_times and patient_data.get('telegram_chat_id'):
                 # Add to session state
                 reminder = {
                     'medication': medication_name,
                     'dosage': dosage,
                     'times': reminder_times,
+                    # Times never change after creation, so format them once here
+                    'times_display': ", ".join(reminder_times),
                     'frequency': frequency,
                     'duration': duration_days,
                     'message': reminder_message,
-                    'patient_name': st.session_state.patient_data['name'],
-                    'chat_id': st.session_state.patient_data['telegram_chat_id']
+                    'patient_name': patient_data['name'],
+                    'chat_id': patient_data['telegram_chat_id']
                 }
                 
                 st.session_state.medication_reminders.append(reminder)
                 st.success(f"✅ Added reminder for {medication_name} ({frequency}x daily)")
-                st.rerun()
             else:
                 st.error("❌ Please fill in medication name, set reminder times, and ensure Telegram chat ID is available")
     
-    # Display current reminders
-    if st.session_state.medication_reminders:
-        st.subheader("📋 Current Medication Reminders")
-        
-        for i, reminder in enumerate(st.session_state.medication_reminders):
-            col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-            
-            with col1:
-                st.write(f"**{reminder['medication']}**")
-                if reminder.get('dosage'):
-                    st.write(f"Dosage: {reminder['dosage']}")
-                st.write(f"Frequency: {reminder['frequency']}x daily")
-                st.write(f"Message: {reminder['message']}")
-            
-            with col2:
-                st.write("**Times:**")
-                for j, time in enumerate(reminder['times'], 1):
-                    st.write(f"• {time}")
-            
-            with col3:
-                st.write(f"Duration: {reminder['duration']} days")
-            
-            with col4:
-                if st.button(f"❌ Remove", key=f"remove_{i}"):
-                    st.session_state.medication_reminders.pop(i)
-                    st.rerun()
-    
-    # Start reminders button
-    if st.session_state.medication_reminders:
-        if st.button("🚀 Start All Reminders", type="primary"):
-            with st.spinner("Starting medication reminders..."):
-                try:
-                    scheduler = HealthcareScheduler()
-                    
-                    for reminder in st.session_state.medication_reminders:
-                        # Add medication schedule
-                        scheduler.add_medication_schedule(
-                            medication_name=reminder['medication'],
-                            dosage=reminder.get('dosage', ''),
-                            times=reminder['times'],
-                            duration_days=reminder['duration'],
-                            additional_notes=reminder['message'],
-                            chat_id=reminder['chat_id']
-                        )
-                    
-                    # Start scheduler in background thread
-                    def run_scheduler():
-                        scheduler.start_scheduler()
-                    
-                    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-                    scheduler_thread.start()
-                    
-                    st.success("✅ Medication reminders started successfully!")
-                    st.info("💡 Reminders will be sent via Telegram at the specified times.")
-                    
-                except Exception as e:
-                    st.error(f"❌ Failed to start reminders: {str(e)}")
+    _render_reminders()
     
     # Final summary
     st.subheader("🎉 Discharge Process Complete!")
@@ -753,22 +873,27 @@ def step_6_medication_reminders():
     The patient is now ready for discharge with all necessary documentation and follow-up care arranged.
     """)
 
+# Render function for each workflow step, indexed like STEPS
+STEP_FNS = {
+    1: step_1_audio_upload,
+    2: step_2_patient_form,
+    3: step_3_generate_summary,
+    4: step_4_pdf_generation,
+    5: step_5_notifications,
+    6: step_6_medication_reminders
+}
+
+def _on_navigate():
+    """Jump to the step selected in the sidebar."""
+    st.session_state.step = st.session_state.nav_step
+
 def sidebar_navigation():
     """Sidebar navigation."""
     st.sidebar.title("🏥 Navigation")
     
     # Progress indicator
-    steps = [
-        "Audio Upload",
-        "Patient Form", 
-        "Generate Summary",
-        "Create PDF",
-        "Send Notifications",
-        "Medication Reminders"
-    ]
-    
     st.sidebar.subheader("Progress")
-    for i, step in enumerate(steps, 1):
+    for i, step in enumerate(STEPS, 1):
         if i < st.session_state.step:
             st.sidebar.success(f"✅ {step}")
         elif i == st.session_state.step:
@@ -778,12 +903,17 @@ def sidebar_navigation():
     
     st.sidebar.markdown("---")
     
-    # Manual navigation
+    # Manual navigation, kept in sync with the current step
     st.sidebar.subheader("Manual Navigation")
-    for i, step in enumerate(steps, 1):
-        if st.sidebar.button(f"Go to Step {i}: {step}", key=f"nav_{i}"):
-            st.session_state.step = i
-            st.rerun()
+    st.session_state.nav_step = st.session_state.step
+    st.sidebar.radio(
+        "Go to step",
+        options=range(1, len(STEPS) + 1),
+        format_func=lambda i: f"Step {i}: {STEPS[i - 1]}",
+        key="nav_step",
+        on_change=_on_navigate,
+        label_visibility="collapsed"
+    )
     
     st.sidebar.markdown("---")
     
@@ -798,25 +928,16 @@ def sidebar_navigation():
     # About section
     st.sidebar.markdown("---")
     st.sidebar.subheader("About")
-    st.sidebar.info("""
-    **Healthcare Discharge Assistant**
-    
-    This application helps healthcare providers create comprehensive discharge summaries and manage patient follow-up care.
-    
-    **Features:**
-    - Audio transcription
-    - AI-powered summaries
-    - PDF generation
-    - Automated notifications
-    - Medication reminders
-    - Calendar integration
-    """)
+    st.sidebar.info(ABOUT_TEXT)
 
 def main():
     """Main application function."""
     # Initialize session state
     initialize_session_state()
     
+    # Apply custom styling
+    apply_custom_css()
+    
     # Display header
     main_header()
     
@@ -824,18 +945,9 @@ def main():
     sidebar_navigation()
     
     # Main content based on current step
-    if st.session_state.step == 1:
-        step_1_audio_upload()
-    elif st.session_state.step == 2:
-        step_2_patient_form()
-    elif st.session_state.step == 3:
-        step_3_generate_summary()
-    elif st.session_state.step == 4:
-        step_4_pdf_generation()
-    elif st.session_state.step == 5:
-        step_5_notifications()
-    elif st.session_state.step == 6:
-        step_6_medication_reminders()
+    render_step = STEP_FNS.get(st.session_state.step)
+    if render_step:
+        render_step()
     
     # Footer
     st.markdown("---")
@@ -4,19 +4,27 @@ Google Calendar Integration Module
 
 import os
 import json
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+import httplib2
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google.oauth2 import service_account
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
 from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env only when asked to
+if os.getenv('GCAL_USE_DOTENV'):
+    load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +33,49 @@ logger = logging.getLogger(__name__)
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# Time zone for created events (adjust as needed)
+TIMEZONE = 'America/New_York'
+
+# Maximum number of requests sent in one batch call, kept well below the API limit
+MAX_BATCH_SIZE = 50
+
+# Retries for rate-limit (403/429) and server (5xx) errors; the client library
+# backs off exponentially with random jitter and does not retry permanent errors
+MAX_RETRIES = 5
+
+# Socket timeout (seconds) for Calendar API connections
+HTTP_TIMEOUT = 15
+
+# Only request the event fields callers actually read
+EVENT_LIST_FIELDS = 'items(id,summary,start,end,location),nextPageToken'
+
+@lru_cache(maxsize=None)
+def _load_discovery_document(api: str, version: str) -> str:
+    """
+    Load an API discovery document once per process.
+    
+    Uses the copy bundled with google-api-python-client, so building a
+    service never fetches the document over the network.
+    """
+    document = discovery_cache.get_static_doc(api, version)
+    if document is None:
+        raise FileNotFoundError(f"No bundled discovery document for {api} {version}")
+    return document
+
+@lru_cache(maxsize=4)
+def _load_authorized_user(path: str, mtime: float) -> Credentials:
+    """
+    Parse an OAuth token file, reusing the result until the file changes.
+    
+    Args:
+        path (str): Path to the token file
+        mtime (float): Modification time of the file, used as the cache key
+        
+    Returns:
+        Credentials: Parsed user credentials, shared between managers
+    """
+    return Credentials.from_authorized_user_file(path, SCOPES)
+
 class GoogleCalendarManager:
     """
     A class to manage Google Calendar events for healthcare follow-ups.
@@ -35,10 +86,40 @@ class GoogleCalendarManager:
         Initialize the Google Calendar manager.
         """
         self.creds = None
-        self.service = None
+        # httplib2 connections are not thread-safe, so each thread gets its own service
+        self._local = threading.local()
         self.calendar_id = 'primary'  # Use primary calendar by default
         self._authenticate()
     
+    @property
+    def service(self):
+        """The Calendar API service for the current thread, built on first use."""
+        service = getattr(self._local, 'service', None)
+        if service is None and self.creds is not None:
+            service = self._build_service()
+            self._local.service = service
+        return service
+    
+    @service.setter
+    def service(self, value):
+        self._local.service = value
+    
+    def _build_service(self):
+        """
+        Build a Calendar API service from the locally cached discovery document.
+        
+        The service owns one authorized keep-alive connection, so requests made
+        through it reuse the same TLS session.
+        """
+        http = google_auth_httplib2.AuthorizedHttp(
+            self.creds,
+            http=httplib2.Http(timeout=HTTP_TIMEOUT)
+        )
+        return build_from_document(
+            _load_discovery_document('calendar', 'v3'),
+            http=http
+        )
+    
     def _authenticate(self):
         """Authenticate with Google Calendar API."""
         try:
@@ -49,7 +130,7 @@ class GoogleCalendarManager:
                         'credentials.json', scopes=SCOPES)
                     logger.info("Using Service Account authentication")
                 except Exception as service_account_error:
-                    logger.warning(f"Service Account auth failed: {service_account_error}")
+                    logger.warning("Service Account auth failed: %s", service_account_error)
                     # Fall back to OAuth 2.0 if service account fails
                     self.creds = None
             
@@ -58,7 +139,7 @@ class GoogleCalendarManager:
                 # The file token.json stores the user's access and refresh tokens,
                 # and is created automatically when the authorization flow completes for the first time.
                 if os.path.exists('token.json'):
-                    self.creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+                    self.creds = _load_authorized_user('token.json', os.path.getmtime('token.json'))
                 
                 # If there are no (valid) credentials available, let the user log in.
                 if not self.creds or not self.creds.valid:
@@ -68,20 +149,29 @@ class GoogleCalendarManager:
                         if not os.path.exists('credentials.json'):
                             raise FileNotFoundError("credentials.json not found. Please download it from Google Cloud Console.")
                         
+                        # The browser flow blocks on a local server, so server deploys
+                        # must opt in explicitly rather than hang here
+                        if os.getenv('ALLOW_INTERACTIVE_OAUTH') != '1':
+                            raise RuntimeError("No valid service account or token.json credentials. "
+                                               "Set ALLOW_INTERACTIVE_OAUTH=1 to log in through the browser.")
+                        
+                        from google_auth_oauthlib.flow import InstalledAppFlow
                         flow = InstalledAppFlow.from_client_secrets_file(
                             'credentials.json', SCOPES)
                         self.creds = flow.run_local_server(port=0)
                     
-                    # Save the credentials for the next run
-                    with open('token.json', 'w') as token:
+                    # Save the credentials for the next run; write to a temporary
+                    # file first so a concurrent reader never sees a partial token
+                    with open('token.json.tmp', 'w') as token:
                         token.write(self.creds.to_json())
+                    os.replace('token.json.tmp', 'token.json')
             
             # Build the service
-            self.service = build('calendar', 'v3', credentials=self.creds)
+            self.service = self._build_service()
             logger.info("Google Calendar authentication successful")
             
         except Exception as e:
-            logger.error(f"Error authenticating with Google Calendar: {e}")
+            logger.error("Error authenticating with Google Calendar: %s", e)
             raise
     
     def create_followup_event(self,
@@ -121,16 +211,17 @@ class GoogleCalendarManager:
                 end_datetime=followup_datetime + timedelta(minutes=duration_minutes),
                 location=location,
                 description=description,
-                reminder_minutes=reminder_minutes
+                reminder_minutes=reminder_minutes,
+                patient=patient_name
             )
             
             if event_id:
-                logger.info(f"Created follow-up event for {patient_name} on {followup_datetime.strftime('%Y-%m-%d %H:%M')}")
+                logger.info("Created follow-up event for %s on %s", patient_name, followup_datetime)
             
             return event_id
             
         except Exception as e:
-            logger.error(f"Error creating follow-up event: {e}")
+            logger.error("Error creating follow-up event: %s", e)
             return None
     
     def create_custom_followup_event(self,
@@ -163,16 +254,17 @@ class GoogleCalendarManager:
                 end_datetime=appointment_date + timedelta(minutes=duration_minutes),
                 location=location,
                 description=description,
-                reminder_minutes=reminder_minutes
+                reminder_minutes=reminder_minutes,
+                patient=patient_name
             )
             
             if event_id:
-                logger.info(f"Created custom follow-up event for {patient_name} on {appointment_date.strftime('%Y-%m-%d %H:%M')}")
+                logger.info("Created custom follow-up event for %s on %s", patient_name, appointment_date)
             
             return event_id
             
         except Exception as e:
-            logger.error(f"Error creating custom follow-up event: {e}")
+            logger.error("Error creating custom follow-up event: %s", e)
             return None
     
     def create_medication_review_event(self,
@@ -205,16 +297,17 @@ class GoogleCalendarManager:
                 end_datetime=review_date + timedelta(minutes=45),
                 location=location,
                 description=description,
-                reminder_minutes=reminder_minutes
+                reminder_minutes=reminder_minutes,
+                patient=patient_name
             )
             
             if event_id:
-                logger.info(f"Created medication review event for {patient_name}")
+                logger.info("Created medication review event for %s", patient_name)
             
             return event_id
             
         except Exception as e:
-            logger.error(f"Error creating medication review event: {e}")
+            logger.error("Error creating medication review event: %s", e)
             return None
     
     def create_discharge_summary_event(self,
@@ -247,25 +340,82 @@ class GoogleCalendarManager:
                 end_datetime=discharge_date + timedelta(minutes=15),
                 location=location,
                 description=description,
-                reminder_minutes=reminder_minutes
+                reminder_minutes=reminder_minutes,
+                patient=patient_name
             )
             
             if event_id:
-                logger.info(f"Created discharge summary event for {patient_name}")
+                logger.info("Created discharge summary event for %s", patient_name)
             
             return event_id
             
         except Exception as e:
-            logger.error(f"Error creating discharge summary event: {e}")
+            logger.error("Error creating discharge summary event: %s", e)
             return None
     
+    def _build_event_body(self,
+                          summary: str,
+                          start_datetime: datetime,
+                          end_datetime: datetime,
+                          location: str = "",
+                          description: str = "",
+                          reminder_minutes: int = 60,
+                          patient: str = "") -> Dict[str, Any]:
+        """
+        Build the request body for a calendar event.
+        
+        Args:
+            summary (str): Event summary/title
+            start_datetime (datetime): Start date and time
+            end_datetime (datetime): End date and time
+            location (str): Event location
+            description (str): Event description
+            reminder_minutes (int): Minutes before event to send reminder
+            patient (str): Patient tag stored as a private extended property
+            
+        Returns:
+            Dict: Event resource for the Calendar API
+        """
+        event = {
+            'summary': summary,
+            'start': {
+                'dateTime': start_datetime.isoformat(),
+                'timeZone': TIMEZONE,
+            },
+            'end': {
+                'dateTime': end_datetime.isoformat(),
+                'timeZone': TIMEZONE,
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'email', 'minutes': reminder_minutes},
+                    {'method': 'popup', 'minutes': reminder_minutes},
+                ],
+            },
+        }
+        
+        # Only send optional fields that carry a value
+        if location:
+            event['location'] = location
+        if description:
+            event['description'] = description
+        if patient:
+            # Lets listings filter by patient on the server side
+            event['extendedProperties'] = {'private': {'patient': patient}}
+        
+        return event
+    
     def _create_calendar_event(self,
                              summary: str,
                              start_datetime: datetime,
                              end_datetime: datetime,
                              location: str = "",
                              description: str = "",
-                             reminder_minutes: int = 60) -> Optional[str]:
+                             reminder_minutes: int = 60,
+                             patient: str = "",
+                             batch: Optional[BatchHttpRequest] = None,
+                             request_id: Optional[str] = None) -> Optional[str]:
         """
         Create a calendar event.
         
@@ -276,43 +426,184 @@ class GoogleCalendarManager:
             location (str): Event location
             description (str): Event description
             reminder_minutes (int): Minutes before event to send reminder
+            patient (str): Patient tag stored on the event for server-side filtering
+            batch (BatchHttpRequest, optional): If given, queue the insert on this
+                batch instead of executing it
+            request_id (str, optional): Request ID to use within the batch
             
         Returns:
-            str: Event ID if created successfully, None otherwise
+            str: Event ID if created successfully, None otherwise (always None when batched)
         """
         try:
-            event = {
-                'summary': summary,
-                'location': location,
-                'description': description,
-                'start': {
-                    'dateTime': start_datetime.isoformat(),
-                    'timeZone': 'America/New_York',  # Adjust timezone as needed
-                },
-                'end': {
-                    'dateTime': end_datetime.isoformat(),
-                    'timeZone': 'America/New_York',  # Adjust timezone as needed
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': reminder_minutes},
-                        {'method': 'popup', 'minutes': reminder_minutes},
-                    ],
-                },
-            }
+            event = self._build_event_body(
+                summary=summary,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                location=location,
+                description=description,
+                reminder_minutes=reminder_minutes,
+                patient=patient
+            )
             
-            event = self.service.events().insert(
+            request = self.service.events().insert(
                 calendarId=self.calendar_id, 
                 body=event
-            ).execute()
+            )
+            
+            if batch is not None:
+                batch.add(request, request_id=request_id)
+                return None
+            
+            event = request.execute(num_retries=MAX_RETRIES)
             
             return event.get('id')
             
         except HttpError as error:
-            logger.error(f"Error creating calendar event: {error}")
+            logger.error("Error creating calendar event: %s", error)
             return None
     
+    def create_events_batch(self, events: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Create several calendar events using batched HTTP requests.
+        
+        Args:
+            events (List[Dict]): Event specs, each holding the keyword arguments of
+                _create_calendar_event (summary, start_datetime, end_datetime,
+                location, description, reminder_minutes, patient)
+                
+        Returns:
+            List[Optional[str]]: Event IDs in input order, None for failed events
+        """
+        results: Dict[str, Optional[str]] = {}
+        
+        def callback(request_id, response, exception):
+            if exception is not None:
+                logger.error("Error creating calendar event in batch: %s", exception)
+                results[request_id] = None
+            else:
+                results[request_id] = response.get('id')
+        
+        # Send at most MAX_BATCH_SIZE inserts per HTTP call
+        for start in range(0, len(events), MAX_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for index, spec in enumerate(events[start:start + MAX_BATCH_SIZE], start):
+                self._create_calendar_event(**spec, batch=batch, request_id=str(index))
+            
+            try:
+                batch.execute()
+            except HttpError as error:
+                logger.error("Error executing calendar batch: %s", error)
+        
+        event_ids = [results.get(str(index)) for index in range(len(events))]
+        logger.info("Created %s/%s events in batch", sum(1 for event_id in event_ids if event_id), len(events))
+        return event_ids
+    
+    def create_events_concurrent(self,
+                                 events: List[Dict[str, Any]],
+                                 max_workers: int = 4) -> List[Optional[str]]:
+        """
+        Create several calendar events in parallel, one API client per worker thread.
+        
+        Args:
+            events (List[Dict]): Event specs, each holding the keyword arguments of
+                _create_calendar_event (summary, start_datetime, end_datetime,
+                location, description, reminder_minutes, patient)
+            max_workers (int): Maximum concurrent requests, kept low to avoid rate limits
+                
+        Returns:
+            List[Optional[str]]: Event IDs in input order, None for failed events
+        """
+        event_ids: List[Optional[str]] = [None] * len(events)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._create_calendar_event, **spec): index
+                for index, spec in enumerate(events)
+            }
+            for future in as_completed(futures):
+                try:
+                    event_ids[futures[future]] = future.result()
+                except Exception as e:
+                    logger.error("Error creating calendar event concurrently: %s", e)
+        
+        logger.info("Created %s/%s events concurrently", sum(1 for event_id in event_ids if event_id), len(events))
+        return event_ids
+    
+    async def create_events_async(self,
+                                  events: List[Dict[str, Any]],
+                                  max_workers: int = 4) -> List[Optional[str]]:
+        """
+        Create several calendar events from async code without blocking the event loop.
+        
+        The inserts run on a worker pool (one API client per thread) and are
+        awaited together, so callers already inside an event loop can overlap
+        them with other I/O.
+        
+        Args:
+            events (List[Dict]): Event specs, each holding the keyword arguments of
+                _create_calendar_event (summary, start_datetime, end_datetime,
+                location, description, reminder_minutes, patient)
+            max_workers (int): Maximum concurrent requests, kept low to avoid rate limits
+                
+        Returns:
+            List[Optional[str]]: Event IDs in input order, None for failed events
+        """
+        loop = asyncio.get_running_loop()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, lambda spec=spec: self._create_calendar_event(**spec))
+                  for spec in events),
+                return_exceptions=True
+            )
+        
+        event_ids: List[Optional[str]] = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Error creating calendar event asynchronously: %s", result)
+                event_ids.append(None)
+            else:
+                event_ids.append(result)
+        
+        logger.info("Created %s/%s events asynchronously", sum(1 for event_id in event_ids if event_id), len(events))
+        return event_ids
+    
+    def _list_events(self, max_results: Optional[int] = None, **params) -> List[Dict[str, Any]]:
+        """
+        List events on the current calendar, following result pages.
+        
+        Args:
+            max_results (int, optional): Stop after this many events; all pages if None
+            **params: Additional query parameters for events().list()
+            
+        Returns:
+            List[Dict]: Events with only the fields in EVENT_LIST_FIELDS, plus
+                '_start' holding the start dateTime or all-day date
+        """
+        events: List[Dict[str, Any]] = []
+        page_token = None
+        
+        while True:
+            if max_results is not None:
+                params['maxResults'] = max_results - len(events)
+            
+            events_result = self.service.events().list(
+                calendarId=self.calendar_id,
+                fields=EVENT_LIST_FIELDS,
+                pageToken=page_token,
+                **params
+            ).execute(num_retries=MAX_RETRIES)
+            
+            for event in events_result.get('items', []):
+                # Timed events have start.dateTime, all-day events only start.date
+                start = event.get('start', {})
+                event['_start'] = start.get('dateTime') or start.get('date')
+                events.append(event)
+            page_token = events_result.get('nextPageToken')
+            
+            if not page_token or (max_results is not None and len(events) >= max_results):
+                return events
+    
     def get_upcoming_events(self, max_results: int = 10) -> List[Dict[str, Any]]:
         """
         Get upcoming calendar events.
@@ -324,17 +615,14 @@ class GoogleCalendarManager:
             List[Dict]: List of upcoming events
         """
         try:
-            now = datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
+            now = datetime.now(timezone.utc).isoformat()
             
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
+            events = self._list_events(
+                max_results=max_results,
                 timeMin=now,
-                maxResults=max_results,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
+            )
             
             if not events:
                 logger.info('No upcoming events found.')
@@ -343,7 +631,7 @@ class GoogleCalendarManager:
             return events
             
         except HttpError as error:
-            logger.error(f"Error getting upcoming events: {error}")
+            logger.error("Error getting upcoming events: %s", error)
             return []
     
     def get_events_for_date(self, date: datetime) -> List[Dict[str, Any]]:
@@ -360,21 +648,62 @@ class GoogleCalendarManager:
             start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
             
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
+            return self._list_events(
                 timeMin=start_of_day.isoformat() + 'Z',
                 timeMax=end_of_day.isoformat() + 'Z',
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            return events
+            )
             
         except HttpError as error:
-            logger.error(f"Error getting events for date: {error}")
+            logger.error("Error getting events for date: %s", error)
             return []
     
+    def get_events_for_dates_bulk(self,
+                                  dates: List[datetime],
+                                  patient: Optional[str] = None) -> Dict[date, List[Dict[str, Any]]]:
+        """
+        Get events for several dates with a single listing over their range.
+        
+        Args:
+            dates (List[datetime]): Dates to get events for
+            patient (str, optional): Only return events tagged with this patient
+            
+        Returns:
+            Dict[date, List[Dict]]: Events grouped by the requested dates
+        """
+        events_by_date: Dict[date, List[Dict[str, Any]]] = {d.date(): [] for d in dates}
+        if not dates:
+            return events_by_date
+        
+        try:
+            start_of_range = min(dates).replace(hour=0, minute=0, second=0, microsecond=0)
+            end_of_range = max(dates).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            
+            params = {}
+            if patient:
+                params['privateExtendedProperty'] = f'patient={patient}'
+            
+            events = self._list_events(
+                timeMin=start_of_range.isoformat() + 'Z',
+                timeMax=end_of_range.isoformat() + 'Z',
+                singleEvents=True,
+                orderBy='startTime',
+                **params
+            )
+            
+            # Bucket client-side by start date; dates outside the request are dropped
+            for event in events:
+                bucket = events_by_date.get(date.fromisoformat(event['_start'][:10]))
+                if bucket is not None:
+                    bucket.append(event)
+            
+            return events_by_date
+            
+        except HttpError as error:
+            logger.error("Error getting events for dates: %s", error)
+            return events_by_date
+    
     def update_event(self, event_id: str, updates: Dict[str, Any]) -> bool:
         """
         Update an existing calendar event.
@@ -391,7 +720,7 @@ class GoogleCalendarManager:
             event = self.service.events().get(
                 calendarId=self.calendar_id, 
                 eventId=event_id
-            ).execute()
+            ).execute(num_retries=MAX_RETRIES)
             
             # Update the event with new data
             for key, value in updates.items():
@@ -403,13 +732,13 @@ class GoogleCalendarManager:
                 calendarId=self.calendar_id,
                 eventId=event_id,
                 body=event
-            ).execute()
+            ).execute(num_retries=MAX_RETRIES)
             
-            logger.info(f"Updated event: {updated_event.get('summary')}")
+            logger.info("Updated event: %s", updated_event.get('summary'))
             return True
             
         except HttpError as error:
-            logger.error(f"Error updating event: {error}")
+            logger.error("Error updating event: %s", error)
             return False
     
     def delete_event(self, event_id: str) -> bool:
@@ -426,13 +755,13 @@ class GoogleCalendarManager:
             self.service.events().delete(
                 calendarId=self.calendar_id, 
                 eventId=event_id
-            ).execute()
+            ).execute(num_retries=MAX_RETRIES)
             
-            logger.info(f"Deleted event: {event_id}")
+            logger.info("Deleted event: %s", event_id)
             return True
             
         except HttpError as error:
-            logger.error(f"Error deleting event: {error}")
+            logger.error("Error deleting event: %s", error)
             return False
     
     def list_calendars(self) -> List[Dict[str, Any]]:
@@ -443,14 +772,14 @@ class GoogleCalendarManager:
             List[Dict]: List of available calendars
         """
         try:
-            calendar_list = self.service.calendarList().list().execute()
+            calendar_list = self.service.calendarList().list().execute(num_retries=MAX_RETRIES)
             calendars = calendar_list.get('items', [])
             
-            logger.info(f"Found {len(calendars)} calendars")
+            logger.info("Found %s calendars", len(calendars))
             return calendars
             
         except HttpError as error:
-            logger.error(f"Error listing calendars: {error}")
+            logger.error("Error listing calendars: %s", error)
             return []
     
     def set_calendar(self, calendar_id: str):
@@ -461,10 +790,21 @@ class GoogleCalendarManager:
             calendar_id (str): Calendar ID to use
         """
         self.calendar_id = calendar_id
-        logger.info(f"Set calendar to: {calendar_id}")
+        logger.info("Set calendar to: %s", calendar_id)
 
 
 # Convenience functions
+@lru_cache(maxsize=1)
+def get_calendar_manager() -> GoogleCalendarManager:
+    """
+    Get a process-wide calendar manager, authenticating on first use only.
+    
+    Returns:
+        GoogleCalendarManager: Shared calendar manager
+    """
+    return GoogleCalendarManager()
+
+
 def create_followup_event(patient_name: str, discharge_date: datetime, 
                          appointment_type: str = "Follow-up") -> Optional[str]:
     """
@@ -478,7 +818,7 @@ def create_followup_event(patient_name: str, discharge_date: datetime,
     Returns:
         str: Event ID if created successfully, None otherwise
     """
-    calendar_manager = GoogleCalendarManager()
+    calendar_manager = get_calendar_manager()
     return calendar_manager.create_followup_event(patient_name, discharge_date, appointment_type)
 
 
@@ -495,7 +835,7 @@ def create_custom_appointment(patient_name: str, appointment_date: datetime,
     Returns:
         str: Event ID if created successfully, None otherwise
     """
-    calendar_manager = GoogleCalendarManager()
+    calendar_manager = get_calendar_manager()
     return calendar_manager.create_custom_followup_event(
         patient_name, appointment_date, appointment_type
     )
@@ -535,5 +875,4 @@ if __name__ == "__main__":
     print(f"Found {len(upcoming_events)} upcoming events")
     
     for event in upcoming_events:
-        start = event['start'].get('dateTime', event['start'].get('date'))
-        print(f"{start} - {event['summary']}") 
\ No newline at end of file
+        print(f"{event['_start']} - {event['summary']}") 
\ No newline at end of file
@@ -3,16 +3,26 @@ Email Sender Module using SMTP for Gmail
 """
 
 import os
+import atexit
+import io
+import base64
 import smtplib
+import socket
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email.mime.application import MIMEApplication
-from email import encoders
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage, MIMEPart
 import logging
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple, Union
+from datetime import date
+from functools import lru_cache
+from html import escape
+from string import Template
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -23,6 +33,387 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared TLS settings; building a context loads the CA store, so do it once
+_SSL_CONTEXT = ssl.create_default_context()
+
+# Reconnect instead of reusing a connection idle for longer than this (seconds);
+# Gmail drops idle SMTP sessions after a few minutes
+SMTP_IDLE_TIMEOUT = 100
+
+# Gmail allows roughly 15 concurrent SMTP sessions per account; stay below it
+MAX_POOL_SIZE = 10
+
+# Pooled connections are rotated after this many messages
+MAX_MESSAGES_PER_CONNECTION = 500
+
+# Delivery attempts for transient SMTP failures, with exponential backoff (seconds)
+SMTP_MAX_ATTEMPTS = 3
+SMTP_RETRY_BASE_DELAY = 0.5
+SMTP_RETRY_MAX_DELAY = 8
+
+# Seconds to reuse a resolved SMTP server address
+DNS_CACHE_TTL = 300
+
+# Gmail rejects messages over 25 MB; leave room for headers and MIME boundaries
+MAX_MESSAGE_SIZE = 24 * 1024 * 1024
+
+# Gmail accepts at most 100 recipients per message
+MAX_RECIPIENTS_PER_MESSAGE = 100
+
+# Attachments are base64-encoded in blocks of this many bytes; a multiple of 57
+# keeps every block a whole number of 76-character base64 lines
+ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+# Total size of base64 attachment payloads kept in memory for re-sends
+ATTACHMENT_CACHE_BYTES = 32 * 1024 * 1024
+
+# HTML email bodies, parsed once at import; optional sections are filled in per call
+_DISCHARGE_EMAIL_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>🏥 Discharge Summary</h2>
+    
+    <p><strong>Patient:</strong> $patient_name</p>
+    <p><strong>Date:</strong> $today</p>
+    
+    $summary_section
+    
+    $notes_section
+    
+    <p>The discharge summary PDF is attached to this email.</p>
+    
+    <p>Please review the information carefully and contact us if you have any questions.</p>
+    
+    <hr>
+    <p><em>This is an automated message from the Healthcare Discharge Assistant.</em></p>
+</body>
+</html>
+""")
+
+_MEDICATION_REMINDER_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>💊 Medication Reminder</h2>
+    
+    <p><strong>Patient:</strong> $patient_name</p>
+    <p><strong>Medication:</strong> $medication_name</p>
+    <p><strong>Dosage:</strong> $dosage</p>
+    <p><strong>Time to Take:</strong> $time_to_take</p>
+    
+    $instructions_section
+    
+    <p>Please take your medication as prescribed.</p>
+    
+    <hr>
+    <p><em>This is an automated reminder from the Healthcare Discharge Assistant.</em></p>
+</body>
+</html>
+""")
+
+_FOLLOWUP_REMINDER_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>📅 Follow-up Appointment Reminder</h2>
+    
+    <p><strong>Patient:</strong> $patient_name</p>
+    <p><strong>Appointment Type:</strong> $appointment_type</p>
+    <p><strong>Date:</strong> $appointment_date</p>
+    <p><strong>Time:</strong> $appointment_time</p>
+    
+    $location_section
+    
+    $notes_section
+    
+    <p>Please confirm your appointment or contact us if you need to reschedule.</p>
+    
+    <hr>
+    <p><em>This is an automated reminder from the Healthcare Discharge Assistant.</em></p>
+</body>
+</html>
+""")
+
+@lru_cache(maxsize=1)
+def _long_date(day: date) -> str:
+    """Format a date like 'January 05, 2025', once per day."""
+    return day.strftime('%B %d, %Y')
+
+# Renderers escape every user-supplied field exactly once, and repeat sends
+# (e.g. daily reminders) reuse the cached HTML
+
+@lru_cache(maxsize=256)
+def _render_discharge_body(patient_name: str, summary_text: str,
+                           additional_notes: str, today: str) -> str:
+    """Render the discharge summary email body."""
+    return _DISCHARGE_EMAIL_TEMPLATE.substitute(
+        patient_name=escape(patient_name),
+        today=today,
+        summary_section=f'<p><strong>Summary:</strong><br>{escape(summary_text)}</p>' if summary_text else '',
+        notes_section=f'<p><strong>Additional Notes:</strong><br>{escape(additional_notes)}</p>' if additional_notes else ''
+    )
+
+@lru_cache(maxsize=256)
+def _render_medication_reminder_body(patient_name: str, medication_name: str, dosage: str,
+                                     time_to_take: str, additional_instructions: str) -> str:
+    """Render the medication reminder email body."""
+    return _MEDICATION_REMINDER_TEMPLATE.substitute(
+        patient_name=escape(patient_name),
+        medication_name=escape(medication_name),
+        dosage=escape(dosage),
+        time_to_take=escape(time_to_take),
+        instructions_section=f'<p><strong>Additional Instructions:</strong><br>{escape(additional_instructions)}</p>' if additional_instructions else ''
+    )
+
+@lru_cache(maxsize=256)
+def _render_followup_reminder_body(patient_name: str, appointment_type: str, appointment_date: str,
+                                   appointment_time: str, location: str, notes: str) -> str:
+    """Render the follow-up reminder email body."""
+    return _FOLLOWUP_REMINDER_TEMPLATE.substitute(
+        patient_name=escape(patient_name),
+        appointment_type=escape(appointment_type),
+        appointment_date=escape(appointment_date),
+        appointment_time=escape(appointment_time),
+        location_section=f'<p><strong>Location:</strong> {escape(location)}</p>' if location else '',
+        notes_section=f'<p><strong>Notes:</strong><br>{escape(notes)}</p>' if notes else ''
+    )
+
+# Resolved SMTP server addresses: (host, port) -> (address, expiry)
+_DNS_CACHE: Dict[Tuple[str, int], Tuple[List[str], float]] = {}
+_DNS_CACHE_LOCK = threading.Lock()
+
+def _resolve_smtp_host(host: str, port: int, cache_ttl: float = DNS_CACHE_TTL) -> List[str]:
+    """
+    Resolve an SMTP server's addresses, reusing the answer for cache_ttl seconds.
+    
+    Args:
+        host (str): Server hostname
+        port (int): Server port
+        cache_ttl (float): Seconds to reuse the resolved addresses
+        
+    Returns:
+        List[str]: IP addresses to try, in resolver order
+    """
+    now = time.monotonic()
+    with _DNS_CACHE_LOCK:
+        cached = _DNS_CACHE.get((host, port))
+        if cached and cached[1] > now:
+            return cached[0]
+    
+    # Keep every address (e.g. IPv6 and IPv4) so an unreachable one can be skipped
+    addresses = list(dict.fromkeys(
+        info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    ))
+    with _DNS_CACHE_LOCK:
+        _DNS_CACHE[(host, port)] = (addresses, now + cache_ttl)
+    return addresses
+
+class _CachedDNSMixin:
+    """
+    Connect smtplib clients to a cached address for the server hostname.
+    
+    Only the TCP connection uses the cached IP; TLS still verifies the
+    certificate against the hostname.
+    """
+    
+    def _get_socket(self, host, port, timeout):
+        # Try each address in turn, like socket.create_connection does
+        error = None
+        for address in _resolve_smtp_host(host, port):
+            try:
+                return super()._get_socket(address, port, timeout)
+            except OSError as e:
+                error = e
+        
+        # The addresses may have moved; resolve again on the next attempt
+        with _DNS_CACHE_LOCK:
+            _DNS_CACHE.pop((host, port), None)
+        raise error
+
+class _CachedDNSSMTP(_CachedDNSMixin, smtplib.SMTP):
+    pass
+
+class _CachedDNSSMTP_SSL(_CachedDNSMixin, smtplib.SMTP_SSL):
+    pass
+
+def _is_transient_smtp_error(error: Exception) -> bool:
+    """
+    Check whether an SMTP failure is worth retrying.
+    
+    Dropped connections and 4xx replies are temporary; 5xx replies and other
+    SMTP errors (e.g. all recipients refused) are permanent.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # Socket-level failures such as resets and timeouts
+    return isinstance(error, OSError)
+
+def _base64_size(size: int) -> int:
+    """Size in bytes of base64 text for size raw bytes, including line breaks."""
+    encoded = (size + 2) // 3 * 4
+    return encoded + (encoded + 75) // 76
+
+def _encode_file_base64(path: str) -> bytes:
+    """
+    Base64-encode a file block by block for use as a MIME payload.
+    
+    Avoids holding the raw file and its encoded copy in memory at once. The
+    result is returned as bytes so no second, decoded copy is made here.
+    
+    Args:
+        path (str): Path to the file
+        
+    Returns:
+        bytes: ASCII base64 split into 76-character lines
+    """
+    encoded = io.BytesIO()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(ATTACHMENT_CHUNK_SIZE), b""):
+            encoded.write(base64.encodebytes(chunk))
+    return encoded.getvalue()
+
+_attachment_cache: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+_attachment_cache_bytes = 0
+_attachment_cache_lock = threading.Lock()
+
+def _encoded_attachment(path: str, mtime_ns: int, size: int) -> bytes:
+    """
+    Base64 payload of an attachment, cached while the file is unchanged.
+    
+    Re-sending the same discharge PDF (to several recipients, or on retry)
+    then skips the disk read and the encoding. Least recently used payloads
+    are evicted once the cache holds more than ATTACHMENT_CACHE_BYTES.
+    
+    Args:
+        path (str): Path to the file
+        mtime_ns (int): Modification time of the file, part of the cache key
+        size (int): Size of the file, part of the cache key
+        
+    Returns:
+        bytes: ASCII base64 split into 76-character lines
+    """
+    global _attachment_cache_bytes
+    key = (path, mtime_ns, size)
+    with _attachment_cache_lock:
+        payload = _attachment_cache.get(key)
+        if payload is not None:
+            _attachment_cache.move_to_end(key)
+            return payload
+    
+    payload = _encode_file_base64(path)
+    if len(payload) > ATTACHMENT_CACHE_BYTES:
+        return payload
+    
+    with _attachment_cache_lock:
+        if key not in _attachment_cache:
+            _attachment_cache[key] = payload
+            _attachment_cache_bytes += len(payload)
+        while _attachment_cache_bytes > ATTACHMENT_CACHE_BYTES:
+            _, evicted = _attachment_cache.popitem(last=False)
+            _attachment_cache_bytes -= len(evicted)
+    return payload
+
+class SMTPConnectionPool:
+    """
+    A bounded pool of authenticated SMTP connections for concurrent sends.
+    """
+    
+    def __init__(self,
+                 sender: "EmailSender",
+                 size: int = 4,
+                 min_size: int = 0,
+                 max_messages: int = MAX_MESSAGES_PER_CONNECTION):
+        """
+        Initialize the pool.
+        
+        Args:
+            sender (EmailSender): Sender whose credentials the connections use
+            size (int): Maximum number of open connections (capped at MAX_POOL_SIZE)
+            min_size (int): Connections to open up front
+            max_messages (int): Messages sent on a connection before it is replaced
+        """
+        self.sender = sender
+        self.size = max(1, min(size, MAX_POOL_SIZE))
+        self.max_messages = max_messages
+        # Idle connections as [connection, messages_sent, last_used] entries
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        
+        for _ in range(min(min_size, self.size)):
+            self._idle.put([sender._open_connection(), 0, time.monotonic()])
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _is_usable(self, entry: list) -> bool:
+        """Check whether an idle connection can be handed out again."""
+        connection, messages_sent, last_used = entry
+        if messages_sent >= self.max_messages or time.monotonic() - last_used > SMTP_IDLE_TIMEOUT:
+            return False
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPServerDisconnected, OSError):
+            return False
+    
+    @staticmethod
+    def _close_connection(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except smtplib.SMTPException:
+            connection.close()
+        except OSError:
+            pass
+    
+    @contextmanager
+    def acquire(self):
+        """
+        Borrow a live connection, blocking while all connections are in use.
+        
+        Yields:
+            smtplib.SMTP: Authenticated connection, counted as one message sent
+        """
+        self._slots.acquire()
+        entry = None
+        try:
+            while entry is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    entry = [self.sender._open_connection(), 0, 0.0]
+                    break
+                if self._is_usable(candidate):
+                    entry = candidate
+                else:
+                    self._close_connection(candidate[0])
+            
+            try:
+                yield entry[0]
+            except Exception:
+                # Don't hand a connection in an unknown state to the next caller
+                self._close_connection(entry[0])
+                raise
+            
+            entry[1] += 1
+            entry[2] = time.monotonic()
+            self._idle.put(entry)
+        finally:
+            self._slots.release()
+    
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()[0]
+            except queue.Empty:
+                return
+            self._close_connection(connection)
+
+
 class EmailSender:
     """
     A class to send emails via Gmail SMTP.
@@ -35,7 +426,15 @@ class EmailSender:
         self.email = os.getenv('EMAIL')
         self.password = os.getenv('EMAIL_PASSWORD')
         self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
+        # Implicit TLS on 465 saves the STARTTLS round-trips; 587 + STARTTLS
+        # stays available for networks that block 465
+        self.use_starttls = os.getenv('SMTP_USE_STARTTLS', '').lower() in ('1', 'true', 'yes')
+        self.smtp_port = 587 if self.use_starttls else 465
+        
+        # One authenticated SMTP session, opened lazily and reused across sends
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._smtp_lock = threading.Lock()
         
         self._validate_credentials()
     
@@ -46,14 +445,15 @@ class EmailSender:
         if not self.password:
             raise ValueError("EMAIL_PASSWORD not found in environment variables")
         
-        logger.info(f"Email sender initialized for: {self.email}")
+        logger.info("Email sender initialized for: %s", self.email)
     
     def send_discharge_summary_email(self,
                                    recipient_email: str,
                                    patient_name: str,
                                    pdf_path: str,
                                    summary_text: str = "",
-                                   additional_notes: str = "") -> bool:
+                                   additional_notes: str = "",
+                                   pool: Optional[SMTPConnectionPool] = None) -> bool:
         """
         Send a discharge summary email with PDF attachment.
         
@@ -63,6 +463,8 @@ class EmailSender:
             pdf_path (str): Path to the discharge PDF file
             summary_text (str): Summary text to include in email body
             additional_notes (str): Additional notes or instructions
+            pool (SMTPConnectionPool, optional): Pool to send through instead of
+                this sender's own connection
             
         Returns:
             bool: True if email sent successfully, False otherwise
@@ -81,20 +483,78 @@ class EmailSender:
                 subject=subject,
                 body=body,
                 attachment_path=pdf_path,
-                attachment_name=f"Discharge_Summary_{patient_name.replace(' ', '_')}.pdf"
+                attachment_name=f"Discharge_Summary_{patient_name.replace(' ', '_')}.pdf",
+                pool=pool
             )
             
             if success:
-                logger.info(f"Discharge summary email sent to {recipient_email} for {patient_name}")
+                logger.info("Discharge summary email sent to %s for %s", recipient_email, patient_name)
             else:
-                logger.error(f"Failed to send discharge summary email to {recipient_email}")
+                logger.error("Failed to send discharge summary email to %s", recipient_email)
             
             return success
             
         except Exception as e:
-            logger.error(f"Error sending discharge summary email: {e}")
+            logger.exception("Error sending discharge summary email")
             return False
     
+    def send_discharge_summary_to_recipients(self,
+                                             recipient_emails: List[str],
+                                             patient_name: str,
+                                             pdf_path: str,
+                                             summary_text: str = "",
+                                             additional_notes: str = "",
+                                             pool: Optional[SMTPConnectionPool] = None) -> List[bool]:
+        """
+        Send the same discharge summary to several recipients (e.g. patient and caregivers).
+        
+        The message, including the base64-encoded PDF, is serialized once; each
+        recipient only gets its own To header prepended to the shared bytes.
+        
+        Args:
+            recipient_emails (List[str]): Recipients' email addresses
+            patient_name (str): Patient's name
+            pdf_path (str): Path to the discharge PDF file
+            summary_text (str): Summary text to include in email body
+            additional_notes (str): Additional notes or instructions
+            pool (SMTPConnectionPool, optional): Pool to send through instead of
+                this sender's own connection
+            
+        Returns:
+            List[bool]: Send results in input order
+        """
+        try:
+            body = self._create_discharge_email_body(
+                patient_name, summary_text, additional_notes
+            )
+            message = self._build_message(
+                None,
+                f"Discharge Summary - {patient_name}",
+                body,
+                attachments=[(pdf_path, f"Discharge_Summary_{patient_name.replace(' ', '_')}.pdf")]
+            )
+            # SMTP DATA needs CRLF line endings; smtplib only converts str payloads
+            raw = message.as_bytes(policy=message.policy.clone(linesep="\r\n"))
+            
+        except FileNotFoundError:
+            logger.error("Attachment file not found: %s", pdf_path)
+            return [False] * len(recipient_emails)
+        except Exception as e:
+            logger.exception("Error building discharge summary email")
+            return [False] * len(recipient_emails)
+        
+        results = []
+        for recipient_email in recipient_emails:
+            try:
+                self._sendmail(recipient_email, f"To: {recipient_email}\r\n".encode() + raw, pool)
+                results.append(True)
+            except Exception as e:
+                logger.exception("Error sending discharge summary email to %s", recipient_email)
+                results.append(False)
+        
+        logger.info("Discharge summary for %s sent to %s/%s recipients", patient_name, sum(results), len(recipient_emails))
+        return results
+    
     def send_medication_reminder_email(self,
                                      recipient_email: str,
                                      patient_name: str,
@@ -130,12 +590,12 @@ class EmailSender:
             )
             
             if success:
-                logger.info(f"Medication reminder email sent to {recipient_email}")
+                logger.info("Medication reminder email sent to %s", recipient_email)
             
             return success
             
         except Exception as e:
-            logger.error(f"Error sending medication reminder email: {e}")
+            logger.exception("Error sending medication reminder email")
             return False
     
     def send_followup_reminder_email(self,
@@ -176,19 +636,20 @@ class EmailSender:
             )
             
             if success:
-                logger.info(f"Follow-up reminder email sent to {recipient_email}")
+                logger.info("Follow-up reminder email sent to %s", recipient_email)
             
             return success
             
         except Exception as e:
-            logger.error(f"Error sending follow-up reminder email: {e}")
+            logger.exception("Error sending follow-up reminder email")
             return False
     
     def send_general_healthcare_email(self,
                                     recipient_email: str,
                                     subject: str,
                                     body: str,
-                                    attachments: List[str] = None) -> bool:
+                                    attachments: List[str] = None,
+                                    pool: Optional[SMTPConnectionPool] = None) -> bool:
         """
         Send a general healthcare email with optional attachments.
         
@@ -197,6 +658,8 @@ class EmailSender:
             subject (str): Email subject
             body (str): Email body
             attachments (List[str]): List of file paths to attach
+            pool (SMTPConnectionPool, optional): Pool to send through instead of
+                this sender's own connection
             
         Returns:
             bool: True if email sent successfully
@@ -207,61 +670,296 @@ class EmailSender:
                     recipient_email=recipient_email,
                     subject=subject,
                     body=body,
-                    attachment_paths=attachments
+                    attachment_paths=attachments,
+                    pool=pool
                 )
             else:
                 success = self._send_email(
                     recipient_email=recipient_email,
                     subject=subject,
-                    body=body
+                    body=body,
+                    pool=pool
                 )
             
             if success:
-                logger.info(f"General healthcare email sent to {recipient_email}")
+                logger.info("General healthcare email sent to %s", recipient_email)
             
             return success
             
         except Exception as e:
-            logger.error(f"Error sending general healthcare email: {e}")
+            logger.exception("Error sending general healthcare email")
             return False
     
-    def _send_email(self, recipient_email: str, subject: str, body: str) -> bool:
+    def send_identical_blast(self,
+                             subject: str,
+                             body: str,
+                             recipients: List[str],
+                             pool: Optional[SMTPConnectionPool] = None) -> bool:
         """
-        Send a basic email without attachments.
+        Send the same email to many recipients in as few SMTP transactions as possible.
+        
+        The message is built once and delivered with one DATA upload per batch of
+        recipients. Recipients only appear in the envelope, never in the headers,
+        so patients don't see each other's addresses.
         
         Args:
-            recipient_email (str): Recipient's email address
             subject (str): Email subject
             body (str): Email body
+            recipients (List[str]): Recipient email addresses
+            pool (SMTPConnectionPool, optional): Pool to send through
             
         Returns:
-            bool: True if email sent successfully
+            bool: True if every batch was sent successfully
         """
         try:
-            # Create message
-            message = MIMEMultipart()
-            message["From"] = self.email
-            message["To"] = recipient_email
-            message["Subject"] = subject
+            message = self._build_message("undisclosed-recipients:;", subject, body)
+            text = message.as_string()
+            
+            for start in range(0, len(recipients), MAX_RECIPIENTS_PER_MESSAGE):
+                self._sendmail(recipients[start:start + MAX_RECIPIENTS_PER_MESSAGE], text, pool)
             
-            # Add body to email
-            message.attach(MIMEText(body, "html"))
+            logger.info("Identical email sent to %s recipients", len(recipients))
+            return True
             
-            # Create SMTP session
-            context = ssl.create_default_context()
+        except Exception as e:
+            logger.exception("Error sending identical email blast")
+            return False
+    
+    def send_bulk(self,
+                  messages: List[Dict[str, Any]],
+                  pool: Optional[SMTPConnectionPool] = None,
+                  pool_size: int = 4) -> List[bool]:
+        """
+        Send many emails concurrently over pooled SMTP connections.
+        
+        Args:
+            messages (List[Dict]): Messages, each holding the keyword arguments of
+                send_general_healthcare_email (recipient_email, subject, body,
+                attachments)
+            pool (SMTPConnectionPool, optional): Pool to use; a temporary pool of
+                pool_size connections is created and closed if not given
+            pool_size (int): Size of the temporary pool
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email, self.password)
-                
-                # Send email
-                text = message.as_string()
+        Returns:
+            List[bool]: Send results in input order
+        """
+        if not messages:
+            return []
+        
+        owns_pool = pool is None
+        if owns_pool:
+            pool = SMTPConnectionPool(self, size=min(pool_size, len(messages)))
+        
+        try:
+            with ThreadPoolExecutor(max_workers=pool.size) as executor:
+                futures = [
+                    executor.submit(self.send_general_healthcare_email, **message, pool=pool)
+                    for message in messages
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            if owns_pool:
+                pool.close()
+        
+        logger.info("Sent %s/%s emails in bulk", sum(results), len(messages))
+        return results
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the cached SMTP connection, if any."""
+        with self._smtp_lock:
+            self._drop_connection()
+    
+    def _open_connection(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP session."""
+        # Announce the sender's domain in EHLO rather than resolving our own FQDN
+        local_hostname = self.email.split('@')[-1]
+        
+        if self.use_starttls:
+            server = _CachedDNSSMTP(self.smtp_server, self.smtp_port, local_hostname=local_hostname)
+        else:
+            server = _CachedDNSSMTP_SSL(self.smtp_server, self.smtp_port,
+                                        local_hostname=local_hostname, context=_SSL_CONTEXT)
+        
+        try:
+            if self.use_starttls:
+                server.starttls(context=_SSL_CONTEXT)
+            server.login(self.email, self.password)
+        except Exception:
+            server.close()
+            raise
+        
+        return server
+    
+    def _drop_connection(self):
+        """Discard the cached SMTP connection."""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                self._smtp.close()
+            except OSError:
+                pass
+            self._smtp = None
+    
+    def _get_connection(self) -> smtplib.SMTP:
+        """
+        Return the cached SMTP connection, reconnecting if it is stale or dead.
+        
+        Must be called with the connection lock held.
+        """
+        if self._smtp is not None:
+            if time.monotonic() - self._last_used > SMTP_IDLE_TIMEOUT:
+                self._drop_connection()
+            else:
+                try:
+                    if self._smtp.noop()[0] != 250:
+                        self._drop_connection()
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    self._drop_connection()
+        
+        if self._smtp is None:
+            self._smtp = self._open_connection()
+        
+        return self._smtp
+    
+    def _sendmail(self, recipient_email, text: Union[str, bytes], pool: Optional[SMTPConnectionPool] = None):
+        """
+        Send a serialized message over the cached connection or a pooled one.
+        
+        Transient failures (dropped connections, 4xx replies) are retried with
+        jittered exponential backoff on a fresh connection; permanent 5xx
+        rejections are raised immediately.
+        
+        Args:
+            recipient_email (str or List[str]): Recipient address(es)
+            text (str or bytes): Serialized message
+            pool (SMTPConnectionPool, optional): Pool to borrow a connection from
+        """
+        for attempt in range(SMTP_MAX_ATTEMPTS):
+            try:
+                self._sendmail_once(recipient_email, text, pool)
+                return
+            except Exception as e:
+                if attempt == SMTP_MAX_ATTEMPTS - 1 or not _is_transient_smtp_error(e):
+                    raise
+                delay = min(SMTP_RETRY_BASE_DELAY * 2 ** attempt, SMTP_RETRY_MAX_DELAY)
+                logger.warning("Transient SMTP error, retrying in ~%.1fs: %s", delay, e)
+                time.sleep(delay + random.uniform(0, delay))
+    
+    def _sendmail_once(self, recipient_email, text: Union[str, bytes], pool: Optional[SMTPConnectionPool] = None):
+        """Make a single delivery attempt; a failed connection is discarded."""
+        if pool is not None:
+            with pool.acquire() as server:
                 server.sendmail(self.email, recipient_email, text)
+            return
+        
+        with self._smtp_lock:
+            try:
+                self._get_connection().sendmail(self.email, recipient_email, text)
+            except Exception:
+                self._drop_connection()
+                raise
+            self._last_used = time.monotonic()
+    
+    def _build_message(self,
+                       recipient_email: Optional[str],
+                       subject: str,
+                       body: str,
+                       attachments: List[Tuple[str, str]] = (),
+                       skip_missing: bool = False) -> EmailMessage:
+        """
+        Build an HTML email with optional file attachments.
+        
+        Args:
+            recipient_email (str, optional): Recipient's email address; the To
+                header is left out if None
+            subject (str): Email subject
+            body (str): HTML email body
+            attachments (List[Tuple[str, str]]): (file path, attachment name) pairs
+            skip_missing (bool): Leave out missing attachments with a warning
+                instead of raising FileNotFoundError
+            
+        Returns:
+            EmailMessage: The assembled message
+        """
+        # Create message
+        message = EmailMessage()
+        message["From"] = self.email
+        if recipient_email is not None:
+            message["To"] = recipient_email
+        message["Subject"] = subject
+        
+        # Add body to email; quoted-printable keeps the message 7-bit clean
+        message.set_content(body, subtype="html", cte="quoted-printable")
+        
+        # One stat per attachment both checks existence and keys the payload cache
+        files = []
+        for attachment_path, attachment_name in attachments:
+            try:
+                files.append((attachment_path, attachment_name, os.stat(attachment_path)))
+            except FileNotFoundError:
+                if not skip_missing:
+                    raise
+                logger.warning("Attachment file not found: %s", attachment_path)
+        
+        # Reject oversized messages before encoding anything; the server would
+        # only refuse them after the whole upload
+        encoded_size = len(body) + sum(_base64_size(stat.st_size) for _, _, stat in files)
+        if encoded_size > MAX_MESSAGE_SIZE:
+            raise ValueError(f"Email would be {encoded_size / 2**20:.1f} MB after encoding, "
+                             f"over the {MAX_MESSAGE_SIZE / 2**20:.0f} MB limit")
+        
+        # Add attachments
+        for attachment_path, attachment_name, stat in files:
+            payload = _encoded_attachment(attachment_path, stat.st_mtime_ns, stat.st_size)
+            
+            # The payload is already base64, so attach it as a prebuilt part
+            # rather than through add_attachment, which would encode it again
+            part = MIMEPart()
+            part.set_payload(payload)
+            part["Content-Type"] = "application/octet-stream"
+            part["Content-Transfer-Encoding"] = "base64"
+            part.add_header("Content-Disposition", "attachment", filename=attachment_name)
+            
+            if not message.is_multipart():
+                message.make_mixed()
+            message.attach(part)
+        
+        return message
+    
+    def _send_email(self,
+                    recipient_email: str,
+                    subject: str,
+                    body: str,
+                    pool: Optional[SMTPConnectionPool] = None) -> bool:
+        """
+        Send a basic email without attachments.
+        
+        Args:
+            recipient_email (str): Recipient's email address
+            subject (str): Email subject
+            body (str): Email body
+            pool (SMTPConnectionPool, optional): Pool to send through
+            
+        Returns:
+            bool: True if email sent successfully
+        """
+        try:
+            message = self._build_message(recipient_email, subject, body)
+            
+            # Send email over the shared SMTP session
+            self._sendmail(recipient_email, message.as_string(), pool)
             
             return True
             
         except Exception as e:
-            logger.error(f"Error sending email: {e}")
+            logger.exception("Error sending email")
             return False
     
     def _send_email_with_attachment(self, 
@@ -269,7 +967,8 @@ class EmailSender:
                                   subject: str, 
                                   body: str,
                                   attachment_path: str,
-                                  attachment_name: str = None) -> bool:
+                                  attachment_name: str = None,
+                                  pool: Optional[SMTPConnectionPool] = None) -> bool:
         """
         Send an email with a single attachment.
         
@@ -279,65 +978,38 @@ class EmailSender:
             body (str): Email body
             attachment_path (str): Path to attachment file
             attachment_name (str): Name for the attachment
+            pool (SMTPConnectionPool, optional): Pool to send through
             
         Returns:
             bool: True if email sent successfully
         """
         try:
-            if not os.path.exists(attachment_path):
-                logger.error(f"Attachment file not found: {attachment_path}")
-                return False
-            
-            # Create message
-            message = MIMEMultipart()
-            message["From"] = self.email
-            message["To"] = recipient_email
-            message["Subject"] = subject
-            
-            # Add body to email
-            message.attach(MIMEText(body, "html"))
-            
-            # Add attachment
-            with open(attachment_path, "rb") as attachment:
-                part = MIMEBase("application", "octet-stream")
-                part.set_payload(attachment.read())
-            
-            # Encode attachment
-            encoders.encode_base64(part)
-            
-            # Add header
             if attachment_name is None:
                 attachment_name = os.path.basename(attachment_path)
             
-            part.add_header(
-                "Content-Disposition",
-                f"attachment; filename= {attachment_name}",
+            message = self._build_message(
+                recipient_email, subject, body,
+                attachments=[(attachment_path, attachment_name)]
             )
             
-            message.attach(part)
-            
-            # Create SMTP session
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email, self.password)
-                
-                # Send email
-                text = message.as_string()
-                server.sendmail(self.email, recipient_email, text)
+            # Send email over the shared SMTP session
+            self._sendmail(recipient_email, message.as_string(), pool)
             
             return True
             
+        except FileNotFoundError:
+            logger.error("Attachment file not found: %s", attachment_path)
+            return False
         except Exception as e:
-            logger.error(f"Error sending email with attachment: {e}")
+            logger.exception("Error sending email with attachment")
             return False
     
     def _send_email_with_attachments(self,
                                    recipient_email: str,
                                    subject: str,
                                    body: str,
-                                   attachment_paths: List[str]) -> bool:
+                                   attachment_paths: List[str],
+                                   pool: Optional[SMTPConnectionPool] = None) -> bool:
         """
         Send an email with multiple attachments.
         
@@ -346,57 +1018,26 @@ class EmailSender:
             subject (str): Email subject
             body (str): Email body
             attachment_paths (List[str]): List of attachment file paths
+            pool (SMTPConnectionPool, optional): Pool to send through
             
         Returns:
             bool: True if email sent successfully
         """
         try:
-            # Create message
-            message = MIMEMultipart()
-            message["From"] = self.email
-            message["To"] = recipient_email
-            message["Subject"] = subject
-            
-            # Add body to email
-            message.attach(MIMEText(body, "html"))
-            
-            # Add attachments
-            for attachment_path in attachment_paths:
-                if not os.path.exists(attachment_path):
-                    logger.warning(f"Attachment file not found: {attachment_path}")
-                    continue
-                
-                with open(attachment_path, "rb") as attachment:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-                
-                # Encode attachment
-                encoders.encode_base64(part)
-                
-                # Add header
-                attachment_name = os.path.basename(attachment_path)
-                part.add_header(
-                    "Content-Disposition",
-                    f"attachment; filename= {attachment_name}",
-                )
-                
-                message.attach(part)
-            
-            # Create SMTP session
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email, self.password)
-                
-                # Send email
-                text = message.as_string()
-                server.sendmail(self.email, recipient_email, text)
+            attachments = [(path, os.path.basename(path)) for path in attachment_paths]
+            message = self._build_message(
+                recipient_email, subject, body,
+                attachments=attachments,
+                skip_missing=True
+            )
+            
+            # Send email over the shared SMTP session
+            self._sendmail(recipient_email, message.as_string(), pool)
             
             return True
             
         except Exception as e:
-            logger.error(f"Error sending email with attachments: {e}")
+            logger.exception("Error sending email with attachments")
             return False
     
     def _create_discharge_email_body(self, 
@@ -414,29 +1055,9 @@ class EmailSender:
         Returns:
             str: HTML email body
         """
-        body = f"""
-        <html>
-        <body>
-            <h2>🏥 Discharge Summary</h2>
-            
-            <p><strong>Patient:</strong> {patient_name}</p>
-            <p><strong>Date:</strong> {datetime.now().strftime('%B %d, %Y')}</p>
-            
-            {f'<p><strong>Summary:</strong><br>{summary_text}</p>' if summary_text else ''}
-            
-            {f'<p><strong>Additional Notes:</strong><br>{additional_notes}</p>' if additional_notes else ''}
-            
-            <p>The discharge summary PDF is attached to this email.</p>
-            
-            <p>Please review the information carefully and contact us if you have any questions.</p>
-            
-            <hr>
-            <p><em>This is an automated message from the Healthcare Discharge Assistant.</em></p>
-        </body>
-        </html>
-        """
-        
-        return body
+        return _render_discharge_body(
+            patient_name, summary_text, additional_notes, _long_date(date.today())
+        )
     
     def _create_medication_reminder_body(self,
                                        patient_name: str,
@@ -457,27 +1078,9 @@ class EmailSender:
         Returns:
             str: HTML email body
         """
-        body = f"""
-        <html>
-        <body>
-            <h2>💊 Medication Reminder</h2>
-            
-            <p><strong>Patient:</strong> {patient_name}</p>
-            <p><strong>Medication:</strong> {medication_name}</p>
-            <p><strong>Dosage:</strong> {dosage}</p>
-            <p><strong>Time to Take:</strong> {time_to_take}</p>
-            
-            {f'<p><strong>Additional Instructions:</strong><br>{additional_instructions}</p>' if additional_instructions else ''}
-            
-            <p>Please take your medication as prescribed.</p>
-            
-            <hr>
-            <p><em>This is an automated reminder from the Healthcare Discharge Assistant.</em></p>
-        </body>
-        </html>
-        """
-        
-        return body
+        return _render_medication_reminder_body(
+            patient_name, medication_name, dosage, time_to_take, additional_instructions
+        )
     
     def _create_followup_reminder_body(self,
                                      patient_name: str,
@@ -500,32 +1103,34 @@ class EmailSender:
         Returns:
             str: HTML email body
         """
-        body = f"""
-        <html>
-        <body>
-            <h2>📅 Follow-up Appointment Reminder</h2>
-            
-            <p><strong>Patient:</strong> {patient_name}</p>
-            <p><strong>Appointment Type:</strong> {appointment_type}</p>
-            <p><strong>Date:</strong> {appointment_date}</p>
-            <p><strong>Time:</strong> {appointment_time}</p>
-            
-            {f'<p><strong>Location:</strong> {location}</p>' if location else ''}
-            
-            {f'<p><strong>Notes:</strong><br>{notes}</p>' if notes else ''}
-            
-            <p>Please confirm your appointment or contact us if you need to reschedule.</p>
-            
-            <hr>
-            <p><em>This is an automated reminder from the Healthcare Discharge Assistant.</em></p>
-        </body>
-        </html>
-        """
-        
-        return body
-
+        return _render_followup_reminder_body(
+            patient_name, appointment_type, appointment_date,
+            appointment_time, location, notes
+        )
 
 # Convenience functions
+_default_instance: Optional[EmailSender] = None
+_default_lock = threading.Lock()
+
+def _default_sender() -> EmailSender:
+    """
+    Get the process-wide EmailSender, creating it on first use.
+    
+    All threads share one sender, whose SMTP connection is guarded by its own
+    lock, so the convenience functions reuse one authenticated session instead
+    of reconnecting per call. The connection is closed at interpreter exit.
+    
+    Returns:
+        EmailSender: Shared sender
+    """
+    global _default_instance
+    if _default_instance is None:
+        with _default_lock:
+            if _default_instance is None:
+                _default_instance = EmailSender()
+                atexit.register(_default_instance.close)
+    return _default_instance
+
 def send_discharge_summary_email(recipient_email: str, patient_name: str, 
                                pdf_path: str, summary_text: str = "") -> bool:
     """
@@ -540,8 +1145,7 @@ def send_discharge_summary_email(recipient_email: str, patient_name: str,
     Returns:
         bool: True if email sent successfully
     """
-    sender = EmailSender()
-    return sender.send_discharge_summary_email(
+    return _default_sender().send_discharge_summary_email(
         recipient_email, patient_name, pdf_path, summary_text
     )
 
@@ -561,8 +1165,7 @@ def send_medication_reminder_email(recipient_email: str, patient_name: str,
     Returns:
         bool: True if email sent successfully
     """
-    sender = EmailSender()
-    return sender.send_medication_reminder_email(
+    return _default_sender().send_medication_reminder_email(
         recipient_email, patient_name, medication_name, dosage, time_to_take
     )
 
@@ -0,0 +1,234 @@
+"""
+Asynchronous Email Sender Module using aiosmtplib for Gmail
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Dict, Any
+
+try:
+    import aiosmtplib
+except ImportError:
+    raise ImportError("aiosmtplib is required for async email sending. "
+                      "Install with: pip install aiosmtplib")
+
+from utils.email_sender import EmailSender, _SSL_CONTEXT
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AsyncEmailSender:
+    """
+    A class to send emails via Gmail SMTP without blocking the event loop.
+    
+    Messages are built by a regular EmailSender and sent over one shared
+    aiosmtplib connection, so many sends can be awaited together.
+    """
+    
+    def __init__(self):
+        """
+        Initialize the async email sender with Gmail credentials from environment variables.
+        """
+        self.sender = EmailSender()
+        self._client: Optional[aiosmtplib.SMTP] = None
+        self._client_lock: Optional[asyncio.Lock] = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    async def _connect(self) -> aiosmtplib.SMTP:
+        """Open and authenticate the shared SMTP connection."""
+        client = aiosmtplib.SMTP(
+            hostname=self.sender.smtp_server,
+            port=self.sender.smtp_port,
+            use_tls=not self.sender.use_starttls,
+            start_tls=self.sender.use_starttls,
+            tls_context=_SSL_CONTEXT
+        )
+        await client.connect()
+        await client.login(self.sender.email, self.sender.password)
+        return client
+    
+    async def _send_message(self, message) -> bool:
+        """
+        Send a built message, reconnecting once if the server dropped the connection.
+        
+        Args:
+            message: Message built by EmailSender._build_message
+        
+        Returns:
+            bool: True if email sent successfully
+        """
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        
+        try:
+            # Connect once; concurrent sends then pipeline over the same client
+            async with self._client_lock:
+                if self._client is None or not self._client.is_connected:
+                    self._client = await self._connect()
+            
+            try:
+                await self._client.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                async with self._client_lock:
+                    if not self._client.is_connected:
+                        self._client = await self._connect()
+                await self._client.send_message(message)
+            
+            return True
+        
+        except Exception as e:
+            logger.exception("Error sending email")
+            return False
+    
+    async def send_discharge_summary_email(self,
+                                           recipient_email: str,
+                                           patient_name: str,
+                                           pdf_path: str,
+                                           summary_text: str = "",
+                                           additional_notes: str = "") -> bool:
+        """
+        Send a discharge summary email with PDF attachment.
+        
+        Args:
+            recipient_email (str): Recipient's email address
+            patient_name (str): Patient's name
+            pdf_path (str): Path to the discharge PDF file
+            summary_text (str): Summary text to include in email body
+            additional_notes (str): Additional notes or instructions
+        
+        Returns:
+            bool: True if email sent successfully, False otherwise
+        """
+        body = self.sender._create_discharge_email_body(
+            patient_name, summary_text, additional_notes
+        )
+        try:
+            message = self.sender._build_message(
+                recipient_email,
+                f"Discharge Summary - {patient_name}",
+                body,
+                attachments=[(pdf_path, f"Discharge_Summary_{patient_name.replace(' ', '_')}.pdf")]
+            )
+        except FileNotFoundError:
+            logger.error("Attachment file not found: %s", pdf_path)
+            return False
+        except ValueError:
+            logger.exception("Error building discharge summary email")
+            return False
+        
+        success = await self._send_message(message)
+        if success:
+            logger.info("Discharge summary email sent to %s for %s", recipient_email, patient_name)
+        return success
+    
+    async def send_medication_reminder_email(self,
+                                             recipient_email: str,
+                                             patient_name: str,
+                                             medication_name: str,
+                                             dosage: str,
+                                             time_to_take: str,
+                                             additional_instructions: str = "") -> bool:
+        """
+        Send a medication reminder email.
+        
+        Args:
+            recipient_email (str): Recipient's email address
+            patient_name (str): Patient's name
+            medication_name (str): Name of the medication
+            dosage (str): Dosage information
+            time_to_take (str): When to take the medication
+            additional_instructions (str): Additional instructions
+        
+        Returns:
+            bool: True if email sent successfully
+        """
+        body = self.sender._create_medication_reminder_body(
+            patient_name, medication_name, dosage, time_to_take, additional_instructions
+        )
+        try:
+            message = self.sender._build_message(
+                recipient_email, f"Medication Reminder - {medication_name}", body
+            )
+        except (FileNotFoundError, ValueError):
+            logger.exception("Error building medication reminder email")
+            return False
+        
+        success = await self._send_message(message)
+        if success:
+            logger.info("Medication reminder email sent to %s", recipient_email)
+        return success
+    
+    async def send_general_healthcare_email(self,
+                                            recipient_email: str,
+                                            subject: str,
+                                            body: str) -> bool:
+        """
+        Send a general healthcare email.
+        
+        Args:
+            recipient_email (str): Recipient's email address
+            subject (str): Email subject
+            body (str): Email body
+        
+        Returns:
+            bool: True if email sent successfully
+        """
+        try:
+            message = self.sender._build_message(recipient_email, subject, body)
+        except (FileNotFoundError, ValueError):
+            logger.exception("Error building email")
+            return False
+        
+        return await self._send_message(message)
+    
+    async def send_many(self, messages: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Send several discharge summary emails concurrently.
+        
+        Args:
+            messages (List[Dict]): Messages, each holding the keyword arguments of
+                send_discharge_summary_email
+        
+        Returns:
+            List[bool]: Send results in input order
+        """
+        results = await asyncio.gather(
+            *(self.send_discharge_summary_email(**message) for message in messages)
+        )
+        logger.info("Sent %s/%s emails asynchronously", sum(results), len(messages))
+        return list(results)
+    
+    async def close(self):
+        """Close the shared SMTP connection, if any."""
+        if self._client is not None and self._client.is_connected:
+            try:
+                await self._client.quit()
+            except aiosmtplib.SMTPException:
+                self._client.close()
+        self._client = None
+
+
+# Convenience functions
+def send_discharge_summary_emails(messages: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Convenience function to send several discharge summary emails concurrently
+    from synchronous code.
+    
+    Args:
+        messages (List[Dict]): Messages, each holding the keyword arguments of
+            AsyncEmailSender.send_discharge_summary_email
+    
+    Returns:
+        List[bool]: Send results in input order
+    """
+    async def run():
+        async with AsyncEmailSender() as sender:
+            return await sender.send_many(messages)
+    
+    return asyncio.run(run())
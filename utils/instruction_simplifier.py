@@ -3,16 +3,32 @@ Medical Instruction Simplifier using LangChain and Open-Source LLMs
 """
 
 import os
-from typing import Optional, List, Dict, Any
+import hashlib
+import importlib.util
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+
+# Let the Rust tokenizer batch-encode on all cores; must be set before
+# transformers/tokenizers is first imported
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
 from langchain.llms import HuggingFacePipeline
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
 import torch
 from dotenv import load_dotenv
 import re
 import logging
+from functools import lru_cache
+from itertools import chain
+
+try:
+    # DFA-based multi-pattern matcher; the regex alternation is used without it
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Load environment variables
 load_dotenv()
@@ -21,24 +37,261 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default instruction-tuned model for simplification
+DEFAULT_MODEL_NAME = "Qwen/Qwen2.5-1.5B-Instruct"
+
+# Draft model for speculative decoding; must share the main model's tokenizer
+DEFAULT_DRAFT_MODEL_NAME = "Qwen/Qwen2.5-0.5B-Instruct"
+
+# Common medical term replacements, keyed by lowercase term
+MEDICAL_TERM_REPLACEMENTS = {
+    'hypertension': 'high blood pressure',
+    'diabetes mellitus': 'diabetes',
+    'myocardial infarction': 'heart attack',
+    'cerebrovascular accident': 'stroke',
+    'pharmacotherapy': 'medication treatment',
+    'therapeutic': 'healing',
+    'prophylactic': 'preventive',
+    'contraindicated': 'not recommended',
+    'adverse effects': 'side effects',
+    'administer': 'give',
+    'oral': 'by mouth',
+    'intravenous': 'through a vein',
+    'subcutaneous': 'under the skin',
+    'intramuscular': 'into the muscle',
+    'diagnosis': 'what the doctor found',
+    'prognosis': 'what to expect',
+    'symptom': 'sign of illness',
+    'chronic': 'long-term',
+    'acute': 'sudden or short-term',
+    'malignant': 'cancerous',
+    'benign': 'non-cancerous',
+    'pathology': 'disease',
+    'etiology': 'cause',
+    'epidemiology': 'how common it is',
+    'pharmacology': 'how medicines work',
+    'immunology': 'how the body fights disease',
+    'cardiology': 'heart health',
+    'neurology': 'brain and nerve health',
+    'oncology': 'cancer treatment',
+    'pediatrics': 'children\'s health',
+    'geriatrics': 'elderly health'
+}
+
+# All terms in one alternation, longest first, so text is scanned only once
+_MEDICAL_TERM_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(sorted(map(re.escape, MEDICAL_TERM_REPLACEMENTS), key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+if ahocorasick is not None:
+    _MEDICAL_TERM_AUTOMATON = ahocorasick.Automaton()
+    for _term, _replacement in MEDICAL_TERM_REPLACEMENTS.items():
+        _MEDICAL_TERM_AUTOMATON.add_word(_term, (len(_term), _replacement))
+    _MEDICAL_TERM_AUTOMATON.make_automaton()
+
+def _is_word_char(char: str) -> bool:
+    """Whether a character counts as part of a word for regex \\b."""
+    return char.isalnum() or char == '_'
+
+def _replace_medical_terms_automaton(text: str) -> Optional[str]:
+    """
+    Replace medical terms using the Aho-Corasick automaton.
+    
+    Matches follow the regex semantics: whole words only, leftmost first and
+    longest at each position.
+    
+    Args:
+        text (str): Text containing medical terms
+        
+    Returns:
+        str: Text with simplified medical terms, or None if lowercasing changed
+             the text length so match offsets would not line up
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        return None
+    
+    matches = []
+    for end, (length, replacement) in _MEDICAL_TERM_AUTOMATON.iter(lowered):
+        start = end - length + 1
+        if start > 0 and _is_word_char(lowered[start - 1]):
+            continue
+        if end + 1 < len(lowered) and _is_word_char(lowered[end + 1]):
+            continue
+        matches.append((start, -length, replacement))
+    matches.sort()
+    
+    parts = []
+    position = 0
+    for start, negative_length, replacement in matches:
+        if start < position:
+            continue
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = start - negative_length
+    parts.append(text[position:])
+    
+    return ''.join(parts)
+
+# Dosing abbreviations removed before prompting, and runs of whitespace
+_ABBREVIATION_PATTERN = re.compile(r'\b(?:PRN|BID|TID|QID|QD|QOD)\b')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Prompt headings the model sometimes echoes back
+_PROMPT_ARTIFACT_PATTERN = re.compile(r'(?:Simplified|Medical) Instruction:\s*')
+
+# Words suggesting the simplified text is a sequence of steps
+_SEQUENCE_KEYWORD_PATTERN = re.compile(r'\b(?:steps?|first|second|then|next)\b', re.IGNORECASE)
+
+# Separators long instructions are split at, strongest first
+_SPLIT_PATTERN = re.compile(r'(\n\n|\n|[.!?] )')
+
+def _split_text(text: str, chunk_size: int = 500, chunk_overlap: int = 50) -> List[str]:
+    """
+    Split text into chunks of at most chunk_size characters at sentence or line breaks.
+    
+    Pieces are packed greedily; each chunk starts with the trailing pieces of
+    the previous one that fit in chunk_overlap characters.
+    
+    Args:
+        text (str): Text to split
+        chunk_size (int): Maximum chunk length
+        chunk_overlap (int): Maximum overlap between consecutive chunks
+        
+    Returns:
+        List[str]: Text chunks
+    """
+    # Split into pieces that keep their trailing separator
+    parts = _SPLIT_PATTERN.split(text)
+    pieces = []
+    for i in range(0, len(parts), 2):
+        piece = parts[i] + (parts[i + 1] if i + 1 < len(parts) else '')
+        if len(piece) <= chunk_size:
+            pieces.append(piece)
+        else:
+            # Fall back to word boundaries for over-long sentences
+            pieces.extend(word + ' ' for word in piece.split(' ') if word)
+    
+    chunks = []
+    current = []
+    current_length = 0
+    for piece in pieces:
+        if current and current_length + len(piece) > chunk_size:
+            chunks.append(''.join(current).strip())
+            
+            # Carry the tail of the finished chunk over as overlap
+            overlap = []
+            overlap_length = 0
+            for previous in reversed(current):
+                if overlap_length + len(previous) > chunk_overlap:
+                    break
+                overlap.insert(0, previous)
+                overlap_length += len(previous)
+            
+            # Drop overlap until the next piece fits within chunk_size
+            while overlap and overlap_length + len(piece) > chunk_size:
+                overlap_length -= len(overlap.pop(0))
+            current, current_length = overlap, overlap_length
+        
+        current.append(piece)
+        current_length += len(piece)
+    
+    if current:
+        chunks.append(''.join(current).strip())
+    
+    return [chunk for chunk in chunks if chunk]
+
+# Simplified instructions kept in memory, keyed by model name and prompt digest
+RESULT_CACHE_SIZE = 4096
+_result_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+def _result_cache_key(model_name: str, instruction: str, target_reading_level: str,
+                      additional_context: str) -> Tuple[str, str]:
+    """Build the result cache key for a prompt."""
+    prompt = '\0'.join((instruction, target_reading_level, additional_context))
+    return model_name, hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+
+def _get_cached_result(key: Tuple[str, str]) -> Optional[str]:
+    """Look up a cached simplification, marking it as recently used."""
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is not None:
+            _result_cache.move_to_end(key)
+        return result
+
+def _cache_result(key: Tuple[str, str], result: str):
+    """Store a simplification, evicting the least recently used beyond RESULT_CACHE_SIZE."""
+    with _result_cache_lock:
+        _result_cache[key] = result
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+def _split_prompt_template(template: str) -> Tuple[str, str, str, str]:
+    """
+    Split the prompt template around {medical_instruction} at line breaks.
+    
+    Byte-level BPE pre-tokenizers attach newlines to the punctuation before
+    them (":\n", ".\n") and join runs of blank lines, so the split points sit
+    after the last newline on each side of the instruction; the whitespace in
+    between is tokenized together with the instruction.
+    
+    Args:
+        template (str): Prompt template text
+        
+    Returns:
+        Tuple[str, str, str, str]: Prefix, whitespace before the instruction,
+        whitespace after it up to the last newline, and the remaining suffix
+    """
+    prefix, suffix = template.split("{medical_instruction}")
+    prefix_end = prefix.rfind("\n") + 1
+    leading_space = len(suffix) - len(suffix.lstrip())
+    suffix_start = suffix.rfind("\n", 0, leading_space) + 1
+    return prefix[:prefix_end], prefix[prefix_end:], suffix[:suffix_start], suffix[suffix_start:]
+
 class MedicalInstructionSimplifier:
     """
     A class to simplify complex medical instructions into patient-friendly language.
     """
     
-    def __init__(self, model_name: str = "microsoft/DialoGPT-medium"):
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, quantization: str = "nf4",
+                 compile_model: bool = False, use_speculative: bool = False,
+                 draft_model_name: str = DEFAULT_DRAFT_MODEL_NAME):
         """
         Initialize the simplifier with a specified model.
         
         Args:
             model_name (str): HuggingFace model name for text generation
+            quantization (str): Weight quantization on CUDA: "none", "int8" or
+                "nf4" (4-bit). Requires bitsandbytes; ignored on CPU.
+            compile_model (bool): Compile the model forward pass with torch.compile on CUDA
+                (uses a static KV cache; falls back to eager mode if compilation fails)
+            use_speculative (bool): Speed up single-prompt generation with a draft model
+                (assisted generation)
+            draft_model_name (str): Small model sharing the main model's tokenizer
         """
+        if quantization not in ("none", "int8", "nf4"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        
         self.model_name = model_name
+        self.quantization = quantization
+        self.compile_model = compile_model
+        self.use_speculative = use_speculative
+        self.draft_model_name = draft_model_name
         self.model = None
+        self.draft_model = None
         self.tokenizer = None
         self.pipeline = None
         self.chain = None
-        self.text_splitter = None
+        self.prompt_template = None
+        self.generation_kwargs = None
+        self._prompt_prefix_ids = None
+        self._prompt_lead = None
+        self._prompt_trail = None
+        self._prompt_suffix = None
+        self._prompt_split_exact = False
         self._initialize_model()
     
     def _initialize_model(self):
@@ -47,28 +300,47 @@ class MedicalInstructionSimplifier:
             logger.info(f"Loading model: {self.model_name}")
             
             # Load tokenizer and model
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
             self.model = AutoModelForCausalLM.from_pretrained(
                 self.model_name,
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                device_map="auto" if torch.cuda.is_available() else None
+                **self._model_load_kwargs()
             )
             
+            # Draft model proposing tokens for the main model to verify
+            if self.use_speculative:
+                logger.info(f"Loading draft model: {self.draft_model_name}")
+                self.draft_model = AutoModelForCausalLM.from_pretrained(
+                    self.draft_model_name,
+                    **self._model_load_kwargs()
+                )
+            
             # Add padding token if not present
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
             
+            # Decoder-only models continue from the end, so batched prompts pad on the left
+            self.tokenizer.padding_side = "left"
+            
+            # Generation settings shared by the pipeline and batched generation;
+            # greedy decoding keeps simplifications reproducible
+            self.generation_kwargs = {
+                "max_new_tokens": 128,
+                "use_cache": True,
+                "do_sample": False,
+                "num_beams": 1,
+                "repetition_penalty": 1.15,
+                "pad_token_id": self.tokenizer.eos_token_id
+            }
+            
+            if self.compile_model and torch.cuda.is_available():
+                self._compile_model()
+            
             # Create HuggingFace pipeline
             self.pipeline = pipeline(
                 "text-generation",
                 model=self.model,
                 tokenizer=self.tokenizer,
-                max_length=512,
-                do_sample=True,
-                temperature=0.7,
-                top_p=0.95,
-                repetition_penalty=1.15,
-                pad_token_id=self.tokenizer.eos_token_id
+                **self.generation_kwargs
             )
             
             # Create LangChain pipeline
@@ -95,22 +367,91 @@ class MedicalInstructionSimplifier:
                 """
             )
             
+            # Tokenize the static part of the prompt before the instruction once;
+            # the rest only changes with reading level and context
+            prefix, self._prompt_lead, self._prompt_trail, self._prompt_suffix = \
+                _split_prompt_template(prompt_template.template)
+            self._prompt_prefix_ids = self.tokenizer(prefix).input_ids
+            self._prompt_split_exact = self._check_prompt_split(prompt_template)
+            
             # Create LangChain chain
+            self.prompt_template = prompt_template
             self.chain = LLMChain(llm=llm, prompt=prompt_template)
             
-            # Initialize text splitter for long instructions
-            self.text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=50,
-                separators=["\n\n", "\n", ". ", "! ", "? ", " "]
-            )
-            
             logger.info("Model loaded successfully!")
             
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
     
+    def _compile_model(self):
+        """
+        Compile the model forward pass with torch.compile, falling back to eager mode.
+        
+        The pipeline keeps the model object, so only its forward pass is
+        compiled. torch.compile is lazy, so a short warm-up generation runs
+        here to surface compile errors (e.g. missing triton, or quantized
+        weights) and to build the graphs before the first request. A static
+        KV cache keeps tensor shapes fixed so CUDA graphs are not re-recorded
+        for every new sequence length.
+        """
+        original_forward = self.model.forward
+        try:
+            self.model.forward = torch.compile(original_forward, mode="reduce-overhead", fullgraph=False)
+            
+            inputs = self.tokenizer("Simplify this medical instruction: take one tablet by mouth daily.",
+                                    return_tensors="pt").to(self.model.device)
+            with torch.inference_mode():
+                self.model.generate(
+                    **inputs,
+                    **dict(self.generation_kwargs, max_new_tokens=8, cache_implementation="static")
+                )
+            
+            self.generation_kwargs["cache_implementation"] = "static"
+            logger.info("Compiled model forward pass")
+            
+        except Exception as e:
+            self.model.forward = original_forward
+            logger.warning(f"torch.compile failed, using eager model: {e}")
+    
+    def _model_load_kwargs(self) -> Dict[str, Any]:
+        """
+        Get the from_pretrained arguments for the current device and quantization.
+        
+        Returns:
+            Dict: Keyword arguments for AutoModelForCausalLM.from_pretrained
+        """
+        if not torch.cuda.is_available():
+            return {"torch_dtype": torch.float32, "device_map": None, "attn_implementation": "sdpa"}
+        
+        # FlashAttention 2 when installed, otherwise PyTorch's fused SDPA kernels
+        if importlib.util.find_spec("flash_attn") is not None:
+            attn_implementation = "flash_attention_2"
+        else:
+            attn_implementation = "sdpa"
+        
+        if self.quantization != "none":
+            if importlib.util.find_spec("bitsandbytes") is None:
+                logger.warning("bitsandbytes is not installed, loading the model without quantization. "
+                               "Install with: pip install bitsandbytes")
+            else:
+                from transformers import BitsAndBytesConfig
+                
+                if self.quantization == "int8":
+                    quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+                else:
+                    quantization_config = BitsAndBytesConfig(
+                        load_in_4bit=True,
+                        bnb_4bit_compute_dtype=torch.float16,
+                        bnb_4bit_quant_type="nf4"
+                    )
+                
+                logger.info(f"Loading model with {self.quantization} quantization")
+                return {"quantization_config": quantization_config, "device_map": "auto",
+                        "torch_dtype": torch.float16, "attn_implementation": attn_implementation}
+        
+        return {"torch_dtype": torch.float16, "device_map": "auto", "attn_implementation": attn_implementation}
+    
     def simplify_instruction(self, 
                            medical_instruction: str,
                            target_reading_level: str = "8th grade",
@@ -144,13 +485,24 @@ class MedicalInstructionSimplifier:
                 "additional_context": additional_context or "General patient"
             }
             
+            # Speculative decoding needs direct generate calls
+            if self.draft_model is not None:
+                return self._generate_batch([cleaned_instruction], target_reading_level, additional_context)[0]
+            
+            # Reuse the result if this exact prompt was simplified before
+            cache_key = _result_cache_key(self.model_name, *chain_input.values())
+            cached = _get_cached_result(cache_key)
+            if cached is not None:
+                return cached
+            
             # Generate simplified instruction
             result = self.chain.run(chain_input)
             
             # Post-process the result
-            simplified = self._post_process_simplified_text(result)
+            simplified = self._post_process_simplified_text(result).strip()
+            _cache_result(cache_key, simplified)
             
-            return simplified.strip()
+            return simplified
             
         except Exception as e:
             logger.error(f"Error simplifying instruction: {e}")
@@ -223,47 +575,14 @@ class MedicalInstructionSimplifier:
         Returns:
             str: Text with simplified medical terms
         """
-        # Common medical term replacements
-        medical_replacements = {
-            r'\bhypertension\b': 'high blood pressure',
-            r'\bdiabetes mellitus\b': 'diabetes',
-            r'\bmyocardial infarction\b': 'heart attack',
-            r'\bcerebrovascular accident\b': 'stroke',
-            r'\bpharmacotherapy\b': 'medication treatment',
-            r'\btherapeutic\b': 'healing',
-            r'\bprophylactic\b': 'preventive',
-            r'\bcontraindicated\b': 'not recommended',
-            r'\badverse effects\b': 'side effects',
-            r'\badminister\b': 'give',
-            r'\boral\b': 'by mouth',
-            r'\bintravenous\b': 'through a vein',
-            r'\bsubcutaneous\b': 'under the skin',
-            r'\bintramuscular\b': 'into the muscle',
-            r'\bdiagnosis\b': 'what the doctor found',
-            r'\bprognosis\b': 'what to expect',
-            r'\bsymptom\b': 'sign of illness',
-            r'\bchronic\b': 'long-term',
-            r'\bacute\b': 'sudden or short-term',
-            r'\bmalignant\b': 'cancerous',
-            r'\bbenign\b': 'non-cancerous',
-            r'\bpathology\b': 'disease',
-            r'\betiology\b': 'cause',
-            r'\bepidemiology\b': 'how common it is',
-            r'\bpharmacology\b': 'how medicines work',
-            r'\bimmunology\b': 'how the body fights disease',
-            r'\bcardiology\b': 'heart health',
-            r'\bneurology\b': 'brain and nerve health',
-            r'\boncology\b': 'cancer treatment',
-            r'\bpediatrics\b': 'children\'s health',
-            r'\bgeriatrics\b': 'elderly health'
-        }
-        
-        simplified_text = text
-        
-        for medical_term, simple_explanation in medical_replacements.items():
-            simplified_text = re.sub(medical_term, simple_explanation, simplified_text, flags=re.IGNORECASE)
-        
-        return simplified_text
+        if ahocorasick is not None:
+            simplified_text = _replace_medical_terms_automaton(text)
+            if simplified_text is not None:
+                return simplified_text
+        
+        return _MEDICAL_TERM_PATTERN.sub(
+            lambda match: MEDICAL_TERM_REPLACEMENTS[match.group(0).lower()], text
+        )
     
     def _clean_instruction(self, instruction: str) -> str:
         """
@@ -275,15 +594,10 @@ class MedicalInstructionSimplifier:
         Returns:
             str: Cleaned instruction
         """
-        # Remove extra whitespace
-        cleaned = re.sub(r'\s+', ' ', instruction.strip())
-        
-        # Remove common medical abbreviations that might confuse the model
-        abbreviations_to_remove = ['PRN', 'BID', 'TID', 'QID', 'QD', 'QOD']
-        for abbr in abbreviations_to_remove:
-            cleaned = cleaned.replace(abbr, '')
-        
-        return cleaned
+        # Remove common medical abbreviations that might confuse the model,
+        # then remove extra whitespace (including gaps left by the abbreviations)
+        cleaned = _ABBREVIATION_PATTERN.sub('', instruction)
+        return _WHITESPACE_PATTERN.sub(' ', cleaned).strip()
     
     def _simplify_long_instruction(self, 
                                  instruction: str,
@@ -300,18 +614,12 @@ class MedicalInstructionSimplifier:
         Returns:
             str: Simplified long instruction
         """
-        # Split the instruction into chunks
-        chunks = self.text_splitter.split_text(instruction)
-        
-        simplified_chunks = []
-        
-        for chunk in chunks:
-            simplified_chunk = self.simplify_instruction(
-                chunk,
-                target_reading_level,
-                additional_context
-            )
-            simplified_chunks.append(simplified_chunk)
+        # Split the instruction into chunks and simplify them in one batch
+        chunks = _split_text(instruction)
+        simplified_chunks = self._generate_batch(
+            chunks, target_reading_level, additional_context,
+            offload_kv_cache=torch.cuda.is_available()
+        )
         
         # Combine the simplified chunks
         return "\n\n".join(simplified_chunks)
@@ -326,53 +634,241 @@ class MedicalInstructionSimplifier:
         Returns:
             str: Post-processed text
         """
-        # Remove any remaining model artifacts
-        text = re.sub(r'Simplified Instruction:\s*', '', text)
-        text = re.sub(r'Medical Instruction:\s*', '', text)
-        
-        # Ensure proper sentence structure
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
+        # Remove any remaining model artifacts and ensure proper sentence structure
+        text = _WHITESPACE_PATTERN.sub(' ', _PROMPT_ARTIFACT_PATTERN.sub('', text)).strip()
         
         # Add bullet points for lists if not present
-        if '•' not in text and '-' not in text and any(keyword in text.lower() for keyword in ['step', 'first', 'second', 'then', 'next']):
-            # Simple heuristic to add bullet points
-            lines = text.split('. ')
-            if len(lines) > 2:
-                text = '• ' + '\n• '.join(lines)
+        if '•' not in text and '-' not in text and _SEQUENCE_KEYWORD_PATTERN.search(text):
+            # Simple heuristic to add bullet points: one per sentence when there
+            # are at least three (same result as splitting on '. ' and joining)
+            if text.count('. ') >= 2:
+                text = '• ' + text.replace('. ', '\n• ')
         
         return text
     
+    def _generate_batch(self,
+                        cleaned_instructions: List[str],
+                        target_reading_level: str,
+                        additional_context: str,
+                        batch_size: int = 8,
+                        offload_kv_cache: bool = False) -> List[str]:
+        """
+        Simplify cleaned instructions with batched generate calls.
+        
+        Only the instructions are tokenized per item; the prompt prefix is
+        tokenized at load time and the suffix once per call, unless the
+        tokenizer merges across the split, in which case full prompts are used.
+        
+        Args:
+            cleaned_instructions (List[str]): Instructions already passed through _clean_instruction
+            target_reading_level (str): Target reading level
+            additional_context (str): Additional context
+            batch_size (int): Number of prompts per forward pass
+            offload_kv_cache (bool): Keep the KV cache in CPU memory and prefetch
+                one layer at a time to the GPU
+            
+        Returns:
+            List[str]: Simplified instructions in input order
+        """
+        additional_context = additional_context or "General patient"
+        
+        # Only generate for prompts that have not been simplified before
+        cache_keys = [
+            _result_cache_key(self.model_name, instruction, target_reading_level, additional_context)
+            for instruction in cleaned_instructions
+        ]
+        simplified = [_get_cached_result(key) for key in cache_keys]
+        pending = [i for i, result in enumerate(simplified) if result is None]
+        if not pending:
+            return simplified
+        
+        generation_kwargs = dict(self.generation_kwargs)
+        if offload_kv_cache:
+            generation_kwargs["cache_implementation"] = "offloaded"
+        
+        suffix = self._prompt_suffix.format(
+            target_reading_level=target_reading_level,
+            additional_context=additional_context
+        )
+        pending_instructions = [cleaned_instructions[i] for i in pending]
+        if self._prompt_split_exact:
+            encoded = self._encode_prompts(pending_instructions, suffix)
+        else:
+            encoded = self.tokenizer([
+                self.prompt_template.format(
+                    medical_instruction=instruction,
+                    target_reading_level=target_reading_level,
+                    additional_context=additional_context
+                )
+                for instruction in pending_instructions
+            ]).input_ids
+        sequences = dict(zip(pending, encoded))
+        
+        # Batch prompts of similar length together to minimise padding, then
+        # put the results back in input order
+        order = sorted(pending, key=lambda i: len(sequences[i]))
+        
+        for start in range(0, len(order), batch_size):
+            batch_indices = order[start:start + batch_size]
+            input_ids, attention_mask = self._pad_left([sequences[i] for i in batch_indices])
+            
+            # Assisted generation only supports one sequence at a time
+            batch_kwargs = generation_kwargs
+            if self.draft_model is not None and len(batch_indices) == 1 and not offload_kv_cache:
+                # Assisted generation manages its own dynamic caches
+                batch_kwargs = {k: v for k, v in generation_kwargs.items() if k != "cache_implementation"}
+                batch_kwargs["assistant_model"] = self.draft_model
+            
+            with torch.inference_mode():
+                output_ids = self.model.generate(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    **batch_kwargs
+                )
+            
+            # Drop the prompt tokens and keep only the generated continuation
+            texts = self.tokenizer.batch_decode(output_ids[:, input_ids.shape[1]:], skip_special_tokens=True)
+            for i, text in zip(batch_indices, texts):
+                simplified[i] = self._post_process_simplified_text(text).strip()
+                _cache_result(cache_keys[i], simplified[i])
+        
+        return simplified
+    
+    def _encode_prompts(self, instructions: List[str], suffix: str) -> List[List[int]]:
+        """
+        Build prompt token ids from the pre-tokenized prefix.
+        
+        Args:
+            instructions (List[str]): Cleaned instructions
+            suffix (str): Prompt suffix with reading level and context filled in
+            
+        Returns:
+            List[List[int]]: Token ids per prompt
+        """
+        suffix_ids = self.tokenizer(suffix, add_special_tokens=False).input_ids
+        bodies = self.tokenizer(
+            [self._prompt_lead + instruction + self._prompt_trail for instruction in instructions],
+            add_special_tokens=False
+        ).input_ids
+        return [self._prompt_prefix_ids + body + suffix_ids for body in bodies]
+    
+    def _check_prompt_split(self, prompt_template: PromptTemplate) -> bool:
+        """
+        Check that the split prompt tokenizes exactly like the full prompt.
+        
+        Args:
+            prompt_template (PromptTemplate): The simplification prompt
+            
+        Returns:
+            bool: True if _encode_prompts can be used for this tokenizer
+        """
+        # Instructions starting and ending with letters, digits and punctuation
+        samples = [
+            "Take one tablet by mouth twice daily with food.",
+            "2 puffs every 4 hours as needed for wheezing",
+            "- Keep the wound dry; change the dressing every 48",
+        ]
+        suffix = self._prompt_suffix.format(
+            target_reading_level="8th grade",
+            additional_context="General patient"
+        )
+        split_ids = self._encode_prompts(samples, suffix)
+        full_ids = self.tokenizer([
+            prompt_template.format(
+                medical_instruction=sample,
+                target_reading_level="8th grade",
+                additional_context="General patient"
+            )
+            for sample in samples
+        ]).input_ids
+        if split_ids != full_ids:
+            logger.info("Tokenizer merges across the prompt split; batches tokenize full prompts")
+            return False
+        logger.info("Prompt split matches full-prompt tokenization; batches reuse the prefix tokens")
+        return True
+    
+    def _pad_left(self, sequences: List[List[int]]):
+        """
+        Left-pad token id sequences into batch tensors on the model device.
+        
+        Args:
+            sequences (List[List[int]]): Token ids per prompt
+            
+        Returns:
+            Tuple: input_ids and attention_mask tensors
+        """
+        # Build one flat tensor of all ids and scatter it through the padding
+        # mask; row-major mask order matches the order of the flattened ids
+        lengths = torch.tensor([len(ids) for ids in sequences], dtype=torch.long)
+        max_length = int(lengths.max())
+        mask = torch.arange(max_length) >= (max_length - lengths).unsqueeze(1)
+        
+        input_ids = torch.full((len(sequences), max_length), self.tokenizer.pad_token_id, dtype=torch.long)
+        input_ids[mask] = torch.tensor(list(chain.from_iterable(sequences)), dtype=torch.long)
+        
+        return input_ids.to(self.model.device), mask.long().to(self.model.device)
+    
     def batch_simplify(self, instructions: List[str], 
-                      target_reading_level: str = "8th grade") -> List[str]:
+                      target_reading_level: str = "8th grade",
+                      batch_size: int = 8) -> List[str]:
         """
         Simplify multiple instructions in batch.
         
+        Instructions are passed to the generation pipeline together so the
+        model runs batched forward passes instead of one per instruction.
+        Long instructions are still split and simplified individually.
+        
         Args:
             instructions (List[str]): List of medical instructions
             target_reading_level (str): Target reading level
+            batch_size (int): Number of prompts per forward pass
             
         Returns:
             List[str]: List of simplified instructions
         """
-        simplified_instructions = []
+        simplified_instructions = [None] * len(instructions)
+        cleaned_instructions = []
+        prompt_indices = []
         
         for i, instruction in enumerate(instructions):
-            try:
-                logger.info(f"Simplifying instruction {i+1}/{len(instructions)}")
-                simplified = self.simplify_instruction(instruction, target_reading_level)
-                simplified_instructions.append(simplified)
-            except Exception as e:
-                logger.error(f"Error simplifying instruction {i+1}: {e}")
-                simplified_instructions.append(f"Error: {str(e)}")
+            cleaned_instruction = self._clean_instruction(instruction)
+            if len(cleaned_instruction) > 1000:
+                logger.info(f"Simplifying long instruction {i+1}/{len(instructions)}")
+                simplified_instructions[i] = self.simplify_instruction(instruction, target_reading_level)
+                continue
+            
+            cleaned_instructions.append(cleaned_instruction)
+            prompt_indices.append(i)
+        
+        if not cleaned_instructions:
+            return simplified_instructions
+        
+        try:
+            logger.info(f"Simplifying {len(cleaned_instructions)} instructions in batches of {batch_size}")
+            simplified = self._generate_batch(cleaned_instructions, target_reading_level, "", batch_size)
+            
+            for i, text in zip(prompt_indices, simplified):
+                simplified_instructions[i] = text
+                
+        except Exception as e:
+            logger.error(f"Error simplifying instructions in batch: {e}")
+            for i in prompt_indices:
+                simplified_instructions[i] = f"Error: {str(e)}"
         
         return simplified_instructions
 
 
 # Convenience function for quick simplification
+@lru_cache(maxsize=4)
+def _get_simplifier(model_name: str = DEFAULT_MODEL_NAME) -> MedicalInstructionSimplifier:
+    """Get a shared simplifier per model so the weights are loaded only once."""
+    return MedicalInstructionSimplifier(model_name)
+
+
 def simplify_instruction(medical_instruction: str,
                         target_reading_level: str = "8th grade",
-                        additional_context: str = "") -> str:
+                        additional_context: str = "",
+                        model_name: str = DEFAULT_MODEL_NAME) -> str:
     """
     Convenience function to simplify a medical instruction.
     
@@ -380,12 +876,12 @@ def simplify_instruction(medical_instruction: str,
         medical_instruction (str): Complex medical instruction
         target_reading_level (str): Target reading level
         additional_context (str): Additional context
+        model_name (str): HuggingFace model name for text generation
         
     Returns:
         str: Simplified instruction
     """
-    simplifier = MedicalInstructionSimplifier()
-    return simplifier.simplify_instruction(medical_instruction, target_reading_level, additional_context)
+    return _get_simplifier(model_name).simplify_instruction(medical_instruction, target_reading_level, additional_context)
 
 
 if __name__ == "__main__":
@@ -95,12 +95,21 @@ class ChromaDBMemory:
     def _generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text using sentence transformer."""
         try:
-            embedding = self.embedding_model.encode(text)
+            embedding = self.embedding_model.encode(text, normalize_embeddings=True, convert_to_numpy=True)
             return embedding.tolist()
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             return []
     
+    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for several texts in a single encoder batch."""
+        try:
+            embeddings = self.embedding_model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+            return embeddings.tolist()
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}")
+            return []
+    
     def _create_search_text(self, profile: PatientProfile) -> str:
         """Create searchable text from patient profile."""
         search_parts = [
@@ -114,6 +123,30 @@ class ChromaDBMemory:
         ]
         return " ".join(filter(None, search_parts))
     
+    def _prepare_profile(self, profile: PatientProfile) -> Dict[str, Any]:
+        """Fill in ID and timestamps and convert a profile to ChromaDB metadata."""
+        # Generate unique ID if not provided
+        if not profile.patient_id:
+            profile.patient_id = str(uuid.uuid4())
+        
+        # Update timestamps
+        if not profile.created_at:
+            profile.created_at = datetime.now().isoformat()
+        profile.updated_at = datetime.now().isoformat()
+        
+        # Convert profile to metadata, handling lists
+        metadata = asdict(profile)
+        
+        # Convert lists to strings for ChromaDB compatibility
+        if isinstance(metadata.get('medications'), list):
+            metadata['medications'] = ', '.join(metadata['medications'])
+        if isinstance(metadata.get('risk_factors'), list):
+            metadata['risk_factors'] = ', '.join(metadata['risk_factors'])
+        if isinstance(metadata.get('comorbidities'), list):
+            metadata['comorbidities'] = ', '.join(metadata['comorbidities'])
+        
+        return metadata
+    
     def add_patient_profile(self, profile: PatientProfile) -> bool:
         """
         Add a patient profile to the memory system.
@@ -124,50 +157,48 @@ class ChromaDBMemory:
         Returns:
             bool: True if added successfully
         """
+        return self.add_patient_profiles([profile])
+    
+    def add_patient_profiles(self, profiles: List[PatientProfile]) -> bool:
+        """
+        Add several patient profiles to the memory system in one write.
+        
+        Args:
+            profiles (List[PatientProfile]): Patient profiles to add
+            
+        Returns:
+            bool: True if all profiles were added successfully
+        """
         try:
-            # Generate unique ID if not provided
-            if not profile.patient_id:
-                profile.patient_id = str(uuid.uuid4())
+            if not profiles:
+                return True
             
-            # Update timestamps
-            if not profile.created_at:
-                profile.created_at = datetime.now().isoformat()
-            profile.updated_at = datetime.now().isoformat()
+            metadatas = [self._prepare_profile(profile) for profile in profiles]
             
             # Create searchable text
-            search_text = self._create_search_text(profile)
+            search_texts = [self._create_search_text(profile) for profile in profiles]
             
-            # Generate embedding
-            embedding = self._generate_embedding(search_text)
+            # Generate embeddings in one batch
+            embeddings = self._generate_embeddings(search_texts)
             
-            if not embedding:
-                logger.error("Failed to generate embedding for patient profile")
+            if not embeddings:
+                logger.error("Failed to generate embeddings for patient profiles")
                 return False
             
-            # Convert profile to metadata, handling lists
-            metadata = asdict(profile)
-            
-            # Convert lists to strings for ChromaDB compatibility
-            if isinstance(metadata.get('medications'), list):
-                metadata['medications'] = ', '.join(metadata['medications'])
-            if isinstance(metadata.get('risk_factors'), list):
-                metadata['risk_factors'] = ', '.join(metadata['risk_factors'])
-            if isinstance(metadata.get('comorbidities'), list):
-                metadata['comorbidities'] = ', '.join(metadata['comorbidities'])
-            
             # Add to ChromaDB
             self.collection.add(
-                embeddings=[embedding],
-                documents=[search_text],
-                metadatas=[metadata],
-                ids=[profile.patient_id]
+                embeddings=embeddings,
+                documents=search_texts,
+                metadatas=metadatas,
+                ids=[profile.patient_id for profile in profiles]
             )
             
-            logger.info(f"Added patient profile: {profile.name} ({profile.patient_id})")
+            for profile in profiles:
+                logger.info(f"Added patient profile: {profile.name} ({profile.patient_id})")
             return True
             
         except Exception as e:
-            logger.error(f"Error adding patient profile: {e}")
+            logger.error(f"Error adding patient profiles: {e}")
             return False
     
     def search_similar_patients(self, 
@@ -520,11 +551,34 @@ class ChromaDBMemory:
             with open(filepath, 'r') as f:
                 data = json.load(f)
             
-            imported_count = 0
+            # Skip malformed records and duplicate IDs so one bad record doesn't
+            # fail the whole batched write
+            profiles = []
+            seen_ids = set()
             for patient_data in data.get('patients', []):
-                profile = PatientProfile(**patient_data)
-                if self.add_patient_profile(profile):
-                    imported_count += 1
+                try:
+                    profile = PatientProfile(**patient_data)
+                except TypeError as e:
+                    logger.warning(f"Skipping invalid patient record: {e}")
+                    continue
+                if profile.patient_id:
+                    if profile.patient_id in seen_ids:
+                        logger.warning(f"Skipping duplicate patient ID: {profile.patient_id}")
+                        continue
+                    seen_ids.add(profile.patient_id)
+                profiles.append(profile)
+            
+            if seen_ids:
+                existing_ids = set(self.collection.get(ids=list(seen_ids))['ids'])
+                for patient_id in existing_ids:
+                    logger.warning(f"Skipping patient ID already in memory: {patient_id}")
+                profiles = [profile for profile in profiles if profile.patient_id not in existing_ids]
+            
+            if self.add_patient_profiles(profiles):
+                imported_count = len(profiles)
+            else:
+                # Fall back to one write per profile to import the good ones
+                imported_count = sum(self.add_patient_profile(profile) for profile in profiles)
             
             logger.info(f"Imported {imported_count} patient profiles from {filepath}")
             return True
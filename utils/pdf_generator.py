@@ -4,6 +4,7 @@ PDF Generator Module for Discharge Summaries
 
 import os
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from fpdf import FPDF
@@ -53,7 +54,18 @@ class PDFGenerator:
     
     def __init__(self):
         """Initialize the PDF generator."""
-        self.pdf = None
+        # The document being built is kept per thread so a single generator
+        # can be shared between concurrent Streamlit sessions
+        self._local = threading.local()
+    
+    @property
+    def pdf(self) -> Optional[DischargeSummaryPDF]:
+        """The PDF document currently being built on this thread."""
+        return getattr(self._local, 'pdf', None)
+    
+    @pdf.setter
+    def pdf(self, value: Optional[DischargeSummaryPDF]):
+        self._local.pdf = value
     
     def create_discharge_summary(self, 
                                patient_data: Dict[str, Any],
@@ -5,6 +5,7 @@ Healthcare Scheduler Module for Medication and Follow-up Reminders
 import os
 import schedule
 import threading
+import queue
 import time
 import logging
 from typing import Dict, List, Optional, Any
@@ -76,6 +77,10 @@ class HealthcareScheduler:
         self.followup_schedules: Dict[str, FollowUpSchedule] = {}
         self.scheduler_thread = None
         self.is_running = False
+        # Jobs registered while the loop runs are handed over through this queue,
+        # and the event wakes the loop early instead of polling every second
+        self._pending_jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._wake_event = threading.Event()
         self._load_schedules()
     
     def _load_schedules(self):
@@ -210,7 +215,7 @@ class HealthcareScheduler:
             self.medication_schedules[schedule_id] = schedule
             
             # Schedule the reminders
-            self._schedule_medication_reminders(schedule)
+            self._submit_job(self._schedule_medication_reminders, schedule)
             
             # Save schedules
             self._save_schedules()
@@ -263,7 +268,7 @@ class HealthcareScheduler:
             self.followup_schedules[schedule_id] = schedule
             
             # Schedule the reminders
-            self._schedule_followup_reminders(schedule)
+            self._submit_job(self._schedule_followup_reminders, schedule)
             
             # Save schedules
             self._save_schedules()
@@ -276,6 +281,29 @@ class HealthcareScheduler:
             logger.error(f"Error adding follow-up schedule: {e}")
             raise
     
+    def _submit_job(self, func, *args):
+        """
+        Register reminder jobs, deferring to the scheduler thread if it is running.
+        
+        The schedule library is not thread-safe, so jobs added while the loop is
+        running are queued and registered by the loop itself.
+        """
+        running = self.scheduler_thread is not None and self.scheduler_thread.is_alive()
+        if running and threading.current_thread() is not self.scheduler_thread:
+            self._pending_jobs.put((func, args))
+            self._wake_event.set()
+        else:
+            func(*args)
+    
+    def _drain_pending_jobs(self):
+        """Register all jobs queued while the scheduler loop was waiting."""
+        while True:
+            try:
+                func, args = self._pending_jobs.get_nowait()
+            except queue.Empty:
+                return
+            func(*args)
+    
     def _schedule_medication_reminders(self, medication_schedule: MedicationSchedule):
         """Schedule medication reminders for a given schedule."""
         try:
@@ -447,8 +475,15 @@ class HealthcareScheduler:
         def run_scheduler():
             logger.info("Healthcare scheduler started")
             while self.is_running:
+                # Clear before draining so a job queued from here on re-sets the event
+                self._wake_event.clear()
+                self._drain_pending_jobs()
                 schedule.run_pending()
-                time.sleep(1)
+                
+                # Sleep until the next job is due, or until woken by a new job
+                idle_seconds = schedule.idle_seconds()
+                timeout = max(idle_seconds, 0) if idle_seconds is not None else None
+                self._wake_event.wait(timeout=timeout)
         
         self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         self.scheduler_thread.start()
@@ -457,6 +492,7 @@ class HealthcareScheduler:
     def stop_scheduler(self):
         """Stop the scheduler."""
         self.is_running = False
+        self._wake_event.set()
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
         logger.info("Healthcare scheduler stopped")
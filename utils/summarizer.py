@@ -24,14 +24,17 @@ class DischargeSummarizer:
     A class to generate discharge summaries using HuggingFace models.
     """
     
-    def __init__(self, model_name: str = "google/flan-t5-small"):
+    def __init__(self, model_name: str = "google/flan-t5-small", onnx_path: Optional[str] = None):
         """
         Initialize the summarizer with a specific model.
         
         Args:
             model_name (str): The HuggingFace model name to use
+            onnx_path (str, optional): Directory of an exported (quantized) ONNX model.
+                If provided, the model runs on ONNX Runtime instead of PyTorch.
         """
         self.model_name = model_name
+        self.onnx_path = onnx_path
         self.pipeline = None
         self.chain = None
         self._load_model()
@@ -41,9 +44,15 @@ class DischargeSummarizer:
         try:
             logger.info(f"Loading model: {self.model_name}")
             
-            # Force CPU usage to avoid MPS memory issues on Mac
-            device = -1  # Always use CPU for now
-            logger.info("Forcing CPU usage to avoid MPS memory issues")
+            # Use GPU/MPS when available; ONNX Runtime models always run on CPU
+            if self.onnx_path:
+                device = -1
+            elif torch.cuda.is_available():
+                device = "cuda"
+            elif torch.backends.mps.is_available():
+                device = "mps"
+            else:
+                device = -1
             
             logger.info(f"Device set to use {device}")
             
@@ -51,11 +60,28 @@ class DischargeSummarizer:
             tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             
             # Determine model loading parameters based on device
-            if device != -1:
-                # Use accelerate for GPU/MPS
+            if self.onnx_path:
+                # Use ONNX Runtime with the exported model
+                try:
+                    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+                except ImportError:
+                    raise ImportError("optimum[onnxruntime] is required for ONNX models. "
+                                      "Install with: pip install optimum[onnxruntime]")
+                
+                logger.info(f"Loading ONNX model from: {self.onnx_path}")
+                model = ORTModelForSeq2SeqLM.from_pretrained(self.onnx_path)
+                pipeline_device = device
+            elif device != -1:
+                # Use accelerate for GPU/MPS. T5 activations can overflow in float16,
+                # so prefer bfloat16 where the GPU supports it
+                if device == "cuda" and torch.cuda.is_bf16_supported():
+                    dtype = torch.bfloat16
+                else:
+                    dtype = torch.float16
+                
                 model = AutoModelForSeq2SeqLM.from_pretrained(
                     self.model_name,
-                    torch_dtype=torch.float16,
+                    torch_dtype=dtype,
                     device_map="auto"
                 )
                 # Don't specify device in pipeline when using accelerate
@@ -273,6 +299,46 @@ class DischargeSummarizer:
         return '\n'.join(section_content) if section_content else f"No {section_name} information available."
 
 
+def export_quantized_onnx(model_name: str = "google/flan-t5-small",
+                          output_dir: str = "onnx/flan-t5-small") -> str:
+    """
+    Export a seq2seq model to ONNX and apply dynamic int8 quantization.
+    
+    Args:
+        model_name (str): The HuggingFace model name to export
+        output_dir (str): Directory to write the quantized ONNX model to
+        
+    Returns:
+        str: Path to the quantized model directory
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError:
+        raise ImportError("optimum[onnxruntime] is required for ONNX export. "
+                          "Install with: pip install optimum[onnxruntime]")
+    
+    logger.info(f"Exporting {model_name} to ONNX")
+    
+    # Export with past key values so decoding reuses the KV cache
+    export_dir = os.path.join(output_dir, "fp32")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+    model.save_pretrained(export_dir)
+    
+    # Quantize every exported graph (encoder, decoder, decoder with past)
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+    for onnx_file in sorted(f for f in os.listdir(export_dir) if f.endswith(".onnx")):
+        quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=onnx_file)
+        quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+    
+    # Copy the configs next to the quantized graphs so the directory loads directly
+    model.config.save_pretrained(output_dir)
+    model.generation_config.save_pretrained(output_dir)
+    
+    logger.info(f"Quantized ONNX model saved to: {output_dir}")
+    return output_dir
+
+
 # Convenience function for quick summary generation
 def generate_summary(prompt: str, patient_info: str = "", medical_notes: str = "") -> str:
     """
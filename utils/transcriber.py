@@ -3,9 +3,12 @@ Audio Transcription Module using OpenAI Whisper
 """
 
 import os
+import contextlib
+import subprocess
 import whisper
 import torch
-from typing import Optional, Dict, Any
+import numpy as np
+from typing import Optional, Dict, Any, Union
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
@@ -17,19 +20,80 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+def load_audio(audio_path: str) -> np.ndarray:
+    """
+    Decode an audio file to 16 kHz mono float32 samples with ffmpeg.
+    
+    Decoding once up front lets the caller drop the source file and reuse the
+    samples without Whisper re-running ffmpeg on every transcription call.
+    
+    Args:
+        audio_path (str): Path to the audio file
+        
+    Returns:
+        np.ndarray: Float32 samples in the range [-1, 1]
+    """
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", audio_path,
+        "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "f32le", "-"
+    ]
+    proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {proc.stderr.decode(errors='ignore')}")
+    
+    return np.frombuffer(proc.stdout, dtype=np.float32)
+
+
+def _log_mel_spectrogram_batch(audio: torch.Tensor, n_mels: int) -> torch.Tensor:
+    """
+    Vectorized equivalent of whisper.log_mel_spectrogram for a batch of
+    equal-length segments, computed on the device the audio lives on.
+    
+    Args:
+        audio (torch.Tensor): Float32 audio of shape (batch, samples) at 16 kHz
+        n_mels (int): Number of mel bins expected by the model
+        
+    Returns:
+        torch.Tensor: Log-mel spectrograms of shape (batch, n_mels, frames)
+    """
+    window = torch.hann_window(whisper.audio.N_FFT, device=audio.device)
+    stft = torch.stft(audio, whisper.audio.N_FFT, whisper.audio.HOP_LENGTH,
+                      window=window, return_complex=True)
+    magnitudes = stft[..., :-1].abs() ** 2
+    
+    filters = whisper.audio.mel_filters(audio.device, n_mels)
+    mel_spec = filters @ magnitudes
+    
+    # Clamp the dynamic range per segment, as Whisper does for a single clip
+    log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+    log_spec = torch.maximum(log_spec, log_spec.amax(dim=(-2, -1), keepdim=True) - 8.0)
+    return (log_spec + 4.0) / 4.0
+
+
 class AudioTranscriber:
     """
     A class to transcribe audio files using OpenAI Whisper.
     """
     
-    def __init__(self, model_name: str = "base"):
+    def __init__(self, model_name: str = "base", compute_type: str = "int8"):
         """
         Initialize the transcriber with a specified Whisper model.
         
         Args:
             model_name (str): Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+            compute_type (str): Weight precision on CPU ('int8' or 'float32')
         """
         self.model_name = model_name
+        self.compute_type = compute_type
+        self.device = None
         self.model = None
         self._load_model()
     
@@ -38,19 +102,77 @@ class AudioTranscriber:
         try:
             logger.info(f"Loading Whisper model: {self.model_name}")
             
-            # Check if CUDA is available for GPU acceleration
-            device = "cuda" if torch.cuda.is_available() else "cpu"
+            # Check if CUDA or Apple MPS is available for GPU acceleration
+            if torch.cuda.is_available():
+                device = "cuda"
+            elif torch.backends.mps.is_available():
+                device = "mps"
+            else:
+                device = "cpu"
+            self.device = device
             logger.info(f"Using device: {device}")
             
             # Load the model
-            self.model = whisper.load_model(self.model_name, device=device)
+            if device == "mps":
+                # The sparse alignment-heads buffer cannot be moved to MPS,
+                # so load on CPU and densify it before moving the model
+                self.model = whisper.load_model(self.model_name, device="cpu")
+                self.model.alignment_heads = self.model.alignment_heads.to_dense()
+                self.model = self.model.to(device)
+            else:
+                self.model = whisper.load_model(self.model_name, device=device)
+            
+            if device == "cpu":
+                # Quantize linear layers to int8 on CPU to cut memory bandwidth
+                if self.compute_type == "int8":
+                    self._quantize_model()
+            elif device == "cuda":
+                # Run in half precision on CUDA; autocast keeps LayerNorm in fp32
+                self.model = self.model.half()
+                
+                # The encoder always sees fixed 30 second windows, which makes it a
+                # good fit for CUDA graphs; the decoder has dynamic shapes
+                self.model.encoder = torch.compile(self.model.encoder, mode="reduce-overhead")
+            # On MPS the weights stay fp32: Whisper's LayerNorm runs in fp32,
+            # while its Linear and Conv1d layers cast weights to the fp16 inputs
+            
             logger.info("Whisper model loaded successfully!")
             
         except Exception as e:
             logger.error(f"Error loading Whisper model: {e}")
             raise
     
-    def transcribe_audio(self, audio_path: str, 
+    def _quantize_model(self):
+        """Apply dynamic int8 quantization to the Whisper linear layers."""
+        # Whisper wraps nn.Linear in its own subclass, which the quantizer
+        # does not recognise, so downcast those modules back to nn.Linear first
+        for module in self.model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        
+        self.model = torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info("Applied dynamic int8 quantization to Whisper model")
+    
+    def _inference_context(self):
+        """Return a context manager for running inference on the current device."""
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        # torch.autocast does not support MPS on the pinned torch version
+        if self.device == "cuda":
+            stack.enter_context(torch.autocast(device_type="cuda", dtype=torch.float16))
+        return stack
+    
+    def _describe_audio(self, audio_path: Union[str, np.ndarray]) -> str:
+        """Validate an audio input and return a short description for logging."""
+        if isinstance(audio_path, np.ndarray):
+            return f"<{len(audio_path) / SAMPLE_RATE:.1f}s in-memory audio>"
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        return audio_path
+    
+    def transcribe_audio(self, audio_path: Union[str, np.ndarray], 
                         language: Optional[str] = None,
                         task: str = "transcribe",
                         verbose: bool = False) -> str:
@@ -58,7 +180,8 @@ class AudioTranscriber:
         Transcribe an audio file to text.
         
         Args:
-            audio_path (str): Path to the audio file
+            audio_path (str or np.ndarray): Path to the audio file, or 16 kHz mono
+                float32 samples as returned by load_audio
             language (str, optional): Language code (e.g., 'en', 'es', 'fr'). If None, auto-detect
             task (str): Either 'transcribe' or 'translate' (translate to English)
             verbose (bool): Whether to print verbose output
@@ -68,19 +191,19 @@ class AudioTranscriber:
         """
         try:
             # Validate audio file path
-            if not os.path.exists(audio_path):
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            source = self._describe_audio(audio_path)
             
             # Check if model is loaded
             if self.model is None:
                 raise ValueError("Whisper model not loaded. Please initialize the transcriber.")
             
-            logger.info(f"Transcribing audio file: {audio_path}")
+            logger.info(f"Transcribing audio: {source}")
             
             # Prepare transcription options
             options = {
                 "task": task,
-                "verbose": verbose
+                "verbose": verbose,
+                "fp16": self.device != "cpu"
             }
             
             # Add language if specified
@@ -89,7 +212,8 @@ class AudioTranscriber:
                 logger.info(f"Using specified language: {language}")
             
             # Perform transcription
-            result = self.model.transcribe(audio_path, **options)
+            with self._inference_context():
+                result = self.model.transcribe(audio_path, **options)
             
             # Extract transcribed text
             transcribed_text = result["text"].strip()
@@ -102,6 +226,71 @@ class AudioTranscriber:
             logger.error(f"Error transcribing audio: {e}")
             raise
     
+    def transcribe_chunked(self, audio_path: Union[str, np.ndarray],
+                           language: Optional[str] = None,
+                           task: str = "transcribe",
+                           chunk_length_s: int = 30,
+                           batch_size: int = 4) -> str:
+        """
+        Transcribe an audio file by splitting it into fixed-length segments
+        and decoding the segments in batches.
+        
+        Args:
+            audio_path (str or np.ndarray): Path to the audio file, or 16 kHz mono
+                float32 samples as returned by load_audio
+            language (str, optional): Language code. If None, auto-detect per segment
+            task (str): Either 'transcribe' or 'translate' (translate to English)
+            chunk_length_s (int): Segment length in seconds (at most 30)
+            batch_size (int): Number of segments decoded together
+            
+        Returns:
+            str: Transcribed text
+        """
+        try:
+            source = self._describe_audio(audio_path)
+            
+            if self.model is None:
+                raise ValueError("Whisper model not loaded. Please initialize the transcriber.")
+            
+            logger.info(f"Transcribing audio in chunks: {source}")
+            
+            # Whisper decodes fixed 30 second windows, so longer chunks are not possible
+            chunk_length_s = max(1, min(chunk_length_s, 30))
+            chunk_samples = chunk_length_s * SAMPLE_RATE
+            
+            # Zero-pad the clip to a whole number of chunks and view it as a
+            # (segments, samples) matrix instead of slicing segment by segment
+            audio = load_audio(audio_path) if isinstance(audio_path, str) else audio_path
+            audio = np.pad(audio, (0, -len(audio) % chunk_samples))
+            segments = audio.reshape(-1, chunk_samples)
+            
+            options = whisper.DecodingOptions(
+                task=task,
+                language=language,
+                fp16=self.device != "cpu"
+            )
+            
+            texts = []
+            for start in range(0, len(segments), batch_size):
+                batch = torch.from_numpy(segments[start:start + batch_size]).to(self.model.device)
+                batch = torch.nn.functional.pad(batch, (0, whisper.audio.N_SAMPLES - chunk_samples))
+                mels = _log_mel_spectrogram_batch(batch, self.model.dims.n_mels)
+                
+                with self._inference_context():
+                    results = whisper.decode(self.model, mels, options)
+                texts.extend(result.text.strip() for result in results)
+            
+            transcribed_text = " ".join(text for text in texts if text)
+            
+            logger.info(f"Chunked transcription completed. Segments: {len(segments)}, "
+                        f"Length: {len(transcribed_text)} characters")
+            
+            return transcribed_text
+            
+        except Exception as e:
+            logger.error(f"Error transcribing audio in chunks: {e}")
+            raise
+    
     def transcribe_with_metadata(self, audio_path: str, 
                                 language: Optional[str] = None,
                                 task: str = "transcribe") -> Dict[str, Any]:
@@ -128,14 +317,16 @@ class AudioTranscriber:
             # Prepare options
             options = {
                 "task": task,
-                "verbose": False
+                "verbose": False,
+                "fp16": self.device != "cpu"
             }
             
             if language:
                 options["language"] = language
             
             # Perform transcription
-            result = self.model.transcribe(audio_path, **options)
+            with self._inference_context():
+                result = self.model.transcribe(audio_path, **options)
             
             # Extract metadata
             metadata = {
@@ -152,31 +343,45 @@ class AudioTranscriber:
             logger.error(f"Error transcribing audio with metadata: {e}")
             raise
     
-    def transcribe_medical_audio(self, audio_path: str, 
-                                language: Optional[str] = None) -> str:
+    def transcribe_medical_audio(self, audio_path: Union[str, np.ndarray], 
+                                language: Optional[str] = None,
+                                chunk_length_s: Optional[int] = None,
+                                batch_size: int = 4) -> str:
         """
         Specialized transcription for medical audio with medical terminology handling.
         
         Args:
-            audio_path (str): Path to the audio file
+            audio_path (str or np.ndarray): Path to the audio file, or 16 kHz mono
+                float32 samples as returned by load_audio
             language (str, optional): Language code
+            chunk_length_s (int, optional): If set, transcribe in batched segments of this length
+            batch_size (int): Number of segments decoded together when chunking
             
         Returns:
             str: Transcribed medical text
         """
         try:
-            logger.info(f"Transcribing medical audio: {audio_path}")
+            logger.info(f"Transcribing medical audio: {self._describe_audio(audio_path)}")
             
             # Use larger model for better medical terminology recognition
             if self.model_name in ["tiny", "base"]:
                 logger.warning("Consider using 'small' or larger model for better medical terminology recognition")
             
             # Transcribe with medical context
-            transcribed_text = self.transcribe_audio(
-                audio_path=audio_path,
-                language=language,
-                task="transcribe"
-            )
+            if chunk_length_s:
+                transcribed_text = self.transcribe_chunked(
+                    audio_path=audio_path,
+                    language=language,
+                    task="transcribe",
+                    chunk_length_s=chunk_length_s,
+                    batch_size=batch_size
+                )
+            else:
+                transcribed_text = self.transcribe_audio(
+                    audio_path=audio_path,
+                    language=language,
+                    task="transcribe"
+                )
             
             # Post-process for medical terminology
             processed_text = self._post_process_medical_text(transcribed_text)
@@ -285,7 +490,8 @@ class AudioTranscriber:
 # Convenience function for quick transcription
 def transcribe_audio(audio_path: str, 
                     model_name: str = "base",
-                    language: Optional[str] = None) -> str:
+                    language: Optional[str] = None,
+                    compute_type: str = "int8") -> str:
     """
     Convenience function to transcribe an audio file.
     
@@ -293,11 +499,12 @@ def transcribe_audio(audio_path: str,
         audio_path (str): Path to the audio file
         model_name (str): Whisper model size
         language (str, optional): Language code
+        compute_type (str): Weight precision on CPU ('int8' or 'float32')
         
     Returns:
         str: Transcribed text
     """
-    transcriber = AudioTranscriber(model_name=model_name)
+    transcriber = AudioTranscriber(model_name=model_name, compute_type=compute_type)
     return transcriber.transcribe_audio(audio_path, language=language)
 
 
@@ -311,6 +518,16 @@ def get_available_models() -> list:
     return ["tiny", "base", "small", "medium", "large"]
 
 
+def get_available_compute_types() -> list:
+    """
+    Get list of supported compute types for CPU inference.
+    
+    Returns:
+        list: Available compute types
+    """
+    return ["int8", "float32"]
+
+
 if __name__ == "__main__":
     # Example usage
     transcriber = AudioTranscriber(model_name="base")